@@ -1,13 +1,26 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List
-from sqlalchemy import Column, Integer, String, ForeignKey, create_engine
+from pydantic import BaseModel, TypeAdapter
+from typing import List, Optional
+from sqlalchemy import (Column, Integer, String, Date, ForeignKey, Index, MetaData, Table, and_,
+                        create_engine, delete, func, inspect, insert, select, text)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship, declarative_base, sessionmaker, Session
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import datetime
+import os
+from api_metrics import install_metrics
+from admission_control import install_admission_control
+from request_profiler import install_profiler
+from fast_json import DefaultJSONResponse, serialize_rows
 
-app = FastAPI()
+app = FastAPI(default_response_class=DefaultJSONResponse)
 Base = declarative_base()
 
+# Admission control goes in before CORS, so CORS is the outer layer and 429/503 responses carry its headers
+install_admission_control(app)
+
 # CORS setup
 origins = [
         "http://localhost:3000", # The address of your React frontend
@@ -19,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 # Models
@@ -34,8 +48,18 @@ class AffirmationMessage(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     message = Column(String, nullable=False)
     category = Column(String)
-    date = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
     user = relationship("User", back_populates="affirmations")
+    # Serves "affirmations for user X between two dates" without a table scan
+    __table_args__ = (Index('ix_affirmation_messages_user_date', 'user_id', 'date'),)
+
+class DailyAffirmation(Base):
+    # Precomputed by generate_daily_affirmations; at most one per user per day
+    __tablename__ = 'daily_affirmations'
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    date = Column(Date, primary_key=True)
+    message = Column(String, nullable=False)
+    model = Column(String)
 
 # Pydantic schemas
 class UserCreate(BaseModel):
@@ -50,24 +74,91 @@ class UserRead(BaseModel):
 class AffirmationCreate(BaseModel):
     user_id: int
     message: str
-    category: str = None
-    date: str
+    category: Optional[str] = None
+    date: datetime.date
 
 class AffirmationRead(BaseModel):
     id: int
     user_id: int
     message: str
-    category: str = None
-    date: str
+    category: Optional[str] = None
+    date: datetime.date
+    class Config:
+        orm_mode = True
+
+class DailyAffirmationRead(BaseModel):
+    user_id: int
+    date: datetime.date
+    message: str
     class Config:
         orm_mode = True
 
+# Prebuilt adapters for the list endpoints' fast serialization path
+USER_LIST_ADAPTER = TypeAdapter(List[UserRead])
+AFFIRMATION_LIST_ADAPTER = TypeAdapter(List[AffirmationRead])
+
 # DB setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./affirmation.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base.metadata.create_all(bind=engine)
 
+# Formats accepted for dates stored while the column was a free-form String
+LEGACY_DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%Y/%m/%d")
+
+def _parse_legacy_date(value):
+    """Parses a stored date string, or returns None if it is not in a known unambiguous format."""
+    value = (value or "").strip()
+    try:
+        return datetime.datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def migrate_affirmation_dates(engine):
+    """
+    One-time migration for databases created while affirmation_messages.date
+    was a String column: rewrites every date as ISO YYYY-MM-DD and rebuilds
+    the table with a DATE column. Raises ValueError, leaving the table
+    untouched, if any stored date cannot be parsed, since such rows would make
+    every read of the table fail.
+    """
+    hot = AffirmationMessage.__table__
+    columns = {column["name"]: column["type"] for column in inspect(engine).get_columns(hot.name)}
+    if isinstance(columns["date"], Date):
+        return
+    with engine.begin() as conn:
+        rows = conn.execute(text(f"SELECT id, user_id, message, category, date FROM {hot.name}")).all()
+        migrated, invalid = [], []
+        for row in rows:
+            day = _parse_legacy_date(row.date)
+            if day is None:
+                invalid.append(f"id={row.id} date={row.date!r}")
+            migrated.append({"id": row.id, "user_id": row.user_id, "message": row.message,
+                             "category": row.category, "date": day})
+        if invalid:
+            raise ValueError(f"Cannot migrate {hot.name}.date; fix or remove these rows: {', '.join(invalid)}")
+        # SQLite cannot alter a column type, so the table is rebuilt under its own name
+        conn.execute(text(f"ALTER TABLE {hot.name} RENAME TO {hot.name}_legacy"))
+        for index in hot.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        hot.create(bind=conn)
+        if migrated:
+            conn.execute(insert(hot), migrated)
+        conn.execute(text(f"DROP TABLE {hot.name}_legacy"))
+
+migrate_affirmation_dates(engine)
+# create_all skips indexes on tables that already exist in older databases
+for index in AffirmationMessage.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+install_metrics(app, engine)
+install_profiler(app, engine)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -87,7 +178,8 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 # Get all users
 @app.get("/users", response_model=List[UserRead])
 def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+    # Plain row tuples: no ORM identity map or relationship loading needed
+    return serialize_rows(USER_LIST_ADAPTER, db.query(User.id, User.name).all())
 
 # Get user by id
 @app.get("/users/{user_id}", response_model=UserRead)
@@ -114,10 +206,17 @@ def create_affirmation(affirmation: AffirmationCreate, db: Session = Depends(get
     db.refresh(db_affirmation)
     return db_affirmation
 
-# Get all affirmations
+# Get all affirmations, optionally for one user and/or a date range (inclusive)
 @app.get("/messages", response_model=List[AffirmationRead])
-def get_affirmations(db: Session = Depends(get_db)):
-    return db.query(AffirmationMessage).all()
+def get_affirmations(user_id: Optional[int] = None, start: Optional[datetime.date] = None,
+                     end: Optional[datetime.date] = None, include_archived: bool = False,
+                     db: Session = Depends(get_db)):
+    rows = []
+    if include_archived:
+        for table in archive_tables(db, start, end):
+            rows.extend(db.execute(_range_query(table, user_id, start, end)).all())
+    rows.extend(db.execute(_range_query(AffirmationMessage.__table__, user_id, start, end)).all())
+    return serialize_rows(AFFIRMATION_LIST_ADAPTER, rows)
 
 # Get affirmation by id
 @app.get("/messages/{affirmation_id}", response_model=AffirmationRead)
@@ -125,7 +224,21 @@ def get_affirmation(affirmation_id: int, db: Session = Depends(get_db)):
     affirmation = db.query(AffirmationMessage).filter(AffirmationMessage.id == affirmation_id).first()
     if not affirmation:
         raise HTTPException(status_code=404, detail="Affirmation not found")
-    
+    return affirmation
+
+# Get today's precomputed affirmation (never calls the LLM; falls back to the latest one)
+@app.get("/users/{user_id}/affirmations/today", response_model=DailyAffirmationRead)
+def get_todays_affirmation(user_id: int, db: Session = Depends(get_db)):
+    daily = (db.query(DailyAffirmation)
+             .filter(DailyAffirmation.user_id == user_id, DailyAffirmation.date <= datetime.date.today())
+             .order_by(DailyAffirmation.date.desc())
+             .first())
+    if not daily:
+        if not db.query(User.id).filter(User.id == user_id).first():
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=404, detail="No affirmation has been generated yet")
+    return daily
+
 # Delete user
 @app.delete("/users/{user_id}", response_model=UserRead)
 def delete_user(user_id: int, db: Session = Depends(get_db)):
@@ -134,4 +247,198 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(user)
     db.commit()
-    return user
\ No newline at end of file
+    return user
+
+# --- Archival ---
+# Rows older than the retention window move to one table per month
+# (affirmation_messages_archive_YYYY_MM) so the hot table stays small; archived
+# rows are still served by GET /messages?include_archived=true.
+# Runs only with AFFIRMATION_ARCHIVE=1, since it rewrites the database behind SessionLocal.
+ARCHIVE_ENABLED = os.getenv("AFFIRMATION_ARCHIVE", "0") == "1"
+ARCHIVE_RETENTION_DAYS = int(os.getenv("AFFIRMATION_RETENTION_DAYS", "365"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("AFFIRMATION_ARCHIVE_SECONDS", "21600"))
+ARCHIVE_TABLE_PREFIX = "affirmation_messages_archive_"
+archive_metadata = MetaData()
+
+def archive_table(year, month):
+    """Returns the archive table for one month, defining it on first use."""
+    name = f"{ARCHIVE_TABLE_PREFIX}{year:04d}_{month:02d}"
+    if name not in archive_metadata.tables:
+        Table(name, archive_metadata,
+              Column('id', Integer, primary_key=True),
+              Column('user_id', Integer, nullable=False),
+              Column('message', String, nullable=False),
+              Column('category', String),
+              Column('date', Date, nullable=False),
+              Index(f'ix_{name}_user_date', 'user_id', 'date'))
+    return archive_metadata.tables[name]
+
+def _month_start(day):
+    return day.replace(day=1)
+
+def _next_month(day):
+    return (day.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+
+def archive_tables(db: Session, start=None, end=None):
+    """Returns the existing archive tables whose month overlaps [start, end], oldest first."""
+    tables = []
+    for name in sorted(inspect(db.connection()).get_table_names()):
+        if not name.startswith(ARCHIVE_TABLE_PREFIX):
+            continue
+        year, month = (int(part) for part in name[len(ARCHIVE_TABLE_PREFIX):].split('_'))
+        month_start = datetime.date(year, month, 1)
+        if (start and _next_month(month_start) <= start) or (end and month_start > end):
+            continue
+        tables.append(archive_table(year, month))
+    return tables
+
+def _range_query(table, user_id=None, start=None, end=None):
+    query = select(table.c.id, table.c.user_id, table.c.message, table.c.category, table.c.date)
+    if user_id is not None:
+        query = query.where(table.c.user_id == user_id)
+    if start is not None:
+        query = query.where(table.c.date >= start)
+    if end is not None:
+        query = query.where(table.c.date <= end)
+    return query
+
+def archive_affirmations(db: Session, retention_days=ARCHIVE_RETENTION_DAYS, today=None):
+    """
+    Moves affirmations dated before today - retention_days into their monthly
+    archive tables and returns how many rows moved. Each month is copied and
+    deleted in its own transaction, so an interrupted run loses nothing.
+    """
+    cutoff = (today or datetime.date.today()) - datetime.timedelta(days=retention_days)
+    hot = AffirmationMessage.__table__
+    oldest = db.execute(select(func.min(hot.c.date)).where(hot.c.date < cutoff)).scalar()
+    moved = 0
+    month = _month_start(oldest) if oldest else cutoff
+    while month < cutoff:
+        table = archive_table(month.year, month.month)
+        table.create(bind=db.connection(), checkfirst=True)
+        window = and_(hot.c.date >= month, hot.c.date < min(_next_month(month), cutoff))
+        columns = [hot.c.id, hot.c.user_id, hot.c.message, hot.c.category, hot.c.date]
+        db.execute(insert(table).from_select([c.name for c in columns], select(*columns).where(window)))
+        moved += db.execute(delete(hot).where(window)).rowcount
+        db.commit()
+        month = _next_month(month)
+    return moved
+
+def run_archival():
+    db = SessionLocal()
+    try:
+        archive_affirmations(db)
+    finally:
+        db.close()
+
+async def archive_periodically():
+    while True:
+        await asyncio.to_thread(run_archival)
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+async def start_archival():
+    if ARCHIVE_ENABLED:
+        app.state.archive_task = asyncio.create_task(archive_periodically())
+
+@app.on_event("shutdown")
+async def stop_archival():
+    if ARCHIVE_ENABLED:
+        app.state.archive_task.cancel()
+
+# --- Daily Affirmation Generation ---
+# Once a day every user gets a personalized affirmation generated ahead of
+# demand, so GET /users/{id}/affirmations/today is a single indexed read.
+# Users that already have one for the day are skipped, so reruns resume.
+DAILY_AFFIRMATIONS_ENABLED = os.getenv("DAILY_AFFIRMATIONS", "0") == "1"
+DAILY_AFFIRMATION_MODEL = os.getenv("DAILY_AFFIRMATION_MODEL", "gpt-4.1-mini")
+# Reruns only generate what is missing, so frequent checks are cheap and retry failures
+DAILY_AFFIRMATION_CHECK_SECONDS = float(os.getenv("DAILY_AFFIRMATION_CHECK_SECONDS", "3600"))
+DAILY_AFFIRMATION_PROMPT = (
+    "Write one short, warm, personal affirmation (at most two sentences) for {name} "
+    "to read on {weekday}. Reply with the affirmation only."
+)
+
+def _llm_completion(model_name):
+    """Builds a prompt -> text function for model_name, or raises if no client is configured."""
+    from utils import setup_llm_client, get_completion
+    client, model, api_provider = setup_llm_client(model_name)
+    if client is None:
+        raise RuntimeError(f"LLM client for '{model_name}' could not be configured.")
+    return lambda prompt: get_completion(prompt, client, model, api_provider)
+
+def generate_daily_affirmations(session_factory=None, day=None, complete=None,
+                                model_name=DAILY_AFFIRMATION_MODEL, max_workers=8,
+                                requests_per_second=5.0, batch_size=100):
+    """
+    Generates the affirmation for `day` (default today) for every user that
+    does not have one yet and returns how many were stored. LLM calls run
+    concurrently under a rate limit; results are inserted in bulk, batch_size
+    rows per transaction. Failed calls are skipped and retried on the next run.
+    The LLM client is only set up when some user still needs an affirmation.
+    """
+    from utils import RateLimiter, is_error_response
+
+    session_factory = session_factory or SessionLocal
+    day = day or datetime.date.today()
+    limiter = RateLimiter(requests_per_second)
+
+    db = session_factory()
+    try:
+        already_done = select(DailyAffirmation.user_id).where(DailyAffirmation.date == day)
+        users = db.execute(select(User.id, User.name).where(User.id.not_in(already_done))).all()
+        if not users:
+            return 0
+        complete = complete or _llm_completion(model_name)
+
+        def generate(user_id, name):
+            limiter.wait()
+            return user_id, complete(DAILY_AFFIRMATION_PROMPT.format(name=name, weekday=day.strftime("%A")))
+
+        stored, batch = 0, []
+        def flush():
+            nonlocal stored
+            if batch:
+                # ON CONFLICT DO NOTHING keeps concurrent or repeated runs idempotent; rowcount
+                # (reported by the Core insert) counts only the rows that were actually added
+                result = db.execute(sqlite_insert(DailyAffirmation.__table__).on_conflict_do_nothing(), batch)
+                db.commit()
+                stored += result.rowcount
+                batch.clear()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(generate, user_id, name) for user_id, name in users]
+            for future in as_completed(futures):
+                user_id, message = future.result()
+                if is_error_response(message) or not message.strip():
+                    continue
+                batch.append({"user_id": user_id, "date": day, "message": message.strip(), "model": model_name})
+                if len(batch) >= batch_size:
+                    flush()
+        flush()
+        return stored
+    finally:
+        db.close()
+
+def _seconds_until_tomorrow():
+    now = datetime.datetime.now()
+    tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+    return (tomorrow - now).total_seconds()
+
+async def generate_daily():
+    while True:
+        try:
+            await asyncio.to_thread(generate_daily_affirmations)
+        except Exception as e:
+            print(f"Daily affirmation generation failed: {e}")
+        await asyncio.sleep(min(_seconds_until_tomorrow(), DAILY_AFFIRMATION_CHECK_SECONDS))
+
+@app.on_event("startup")
+async def start_daily_generation():
+    if DAILY_AFFIRMATIONS_ENABLED:
+        app.state.daily_task = asyncio.create_task(generate_daily())
+
+@app.on_event("shutdown")
+async def stop_daily_generation():
+    if DAILY_AFFIRMATIONS_ENABLED:
+        app.state.daily_task.cancel()
@@ -1,16 +1,24 @@
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import sys
 import os
+import threading
+import time
+from sqlalchemy import inspect, text
+from datetime import date, timedelta
 
 # Add project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 # The API code is assumed to be in a file named `main.py` in the same directory.
 # If your file is named differently, update the import statement accordingly.
-from Capstone.main import app, get_db, Base, User
+from Capstone.main import (app, get_db, Base, User, AffirmationMessage, DailyAffirmation, archive_affirmations,
+                          archive_metadata, generate_daily_affirmations, migrate_affirmation_dates)
+import Capstone.main as capstone_main
+from request_profiler import RequestProfile, install_profiler
 
 # --- Test Database Setup ---
 # Use an in-memory SQLite database for isolated testing
@@ -54,6 +62,7 @@ def db_session():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        archive_metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
 def client(db_session):
@@ -242,4 +251,234 @@ class TestAffirmationMessageEndpoints:
         assert len(data) == 2
         assert data[0]["message"] == "First message"
         assert data[1]["message"] == "Second message"
-        assert data[1]["category"] == "Positivity"
\ No newline at end of file
+        assert data[1]["category"] == "Positivity"
+
+    def test_get_affirmations_by_user_and_date_range(self, client, test_user):
+        """Test filtering affirmations by user and an inclusive date range."""
+        other = client.post("/users", json={"name": "Other"}).json()
+        for user_id, day in [(test_user.id, "2023-01-01"), (test_user.id, "2023-01-05"),
+                             (test_user.id, "2023-01-09"), (other["id"], "2023-01-05")]:
+            client.post("/messages", json={"user_id": user_id, "message": day, "date": day})
+
+        response = client.get("/messages", params={"user_id": test_user.id,
+                                                   "start": "2023-01-02", "end": "2023-01-09"})
+        assert response.status_code == 200
+        assert [m["date"] for m in response.json()] == ["2023-01-05", "2023-01-09"]
+
+    def test_get_affirmations_invalid_date(self, client):
+        """Test that a malformed date is rejected."""
+        response = client.get("/messages", params={"start": "last week"})
+        assert response.status_code == 422
+
+    def test_archived_affirmations_remain_queryable(self, client, test_user, db_session):
+        """Test that archival empties old rows from the hot table but include_archived still finds them."""
+        for day in ["2022-12-30", "2023-01-15", "2023-03-01"]:
+            client.post("/messages", json={"user_id": test_user.id, "message": day, "date": day})
+
+        moved = archive_affirmations(db_session, retention_days=30, today=date(2023, 3, 10))
+        assert moved == 2
+        assert [m["date"] for m in client.get("/messages").json()] == ["2023-03-01"]
+
+        response = client.get("/messages", params={"include_archived": True, "start": "2023-01-01"})
+        assert [m["date"] for m in response.json()] == ["2023-01-15", "2023-03-01"]
+        # A second run finds nothing left to move
+        assert archive_affirmations(db_session, retention_days=30, today=date(2023, 3, 10)) == 0
+
+    def test_archival_is_opt_in(self, client):
+        """Test that startup does not archive the database behind SessionLocal unless enabled."""
+        assert not hasattr(app.state, "archive_task")
+
+class TestLegacyDateMigration:
+    """Tests for migrating databases created while the date column was a String."""
+
+    @pytest.fixture
+    def legacy_engine(self, tmp_path):
+        legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with legacy.begin() as conn:
+            conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL)"))
+            conn.execute(text("CREATE TABLE affirmation_messages (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                              "message VARCHAR NOT NULL, category VARCHAR, date VARCHAR NOT NULL)"))
+            conn.execute(text("CREATE INDEX ix_affirmation_messages_user_date ON affirmation_messages (user_id, date)"))
+            conn.execute(text("INSERT INTO users (id, name) VALUES (1, 'Ada')"))
+            conn.execute(text("INSERT INTO affirmation_messages (id, user_id, message, category, date) VALUES "
+                              "(1, 1, 'a', 'work', 'Oct 28, 2023'), (2, 1, 'b', NULL, '2023-10-29'), "
+                              "(3, 1, 'c', NULL, '2023-10-30 08:15:00')"))
+        yield legacy
+        legacy.dispose()
+
+    def test_legacy_dates_are_rewritten_as_dates(self, legacy_engine):
+        """Test that legacy strings are parsed, the column becomes DATE and the index is rebuilt."""
+        migrate_affirmation_dates(legacy_engine)
+        columns = {c["name"]: c["type"] for c in inspect(legacy_engine).get_columns("affirmation_messages")}
+        assert str(columns["date"]) == "DATE"
+        indexes = [i["name"] for i in inspect(legacy_engine).get_indexes("affirmation_messages")]
+        assert indexes == ["ix_affirmation_messages_user_date"]
+        db = sessionmaker(bind=legacy_engine)()
+        rows = db.query(AffirmationMessage).order_by(AffirmationMessage.id).all()
+        assert [(r.id, r.message, r.category, r.date) for r in rows] == [
+            (1, "a", "work", date(2023, 10, 28)), (2, "b", None, date(2023, 10, 29)), (3, "c", None, date(2023, 10, 30))]
+        db.close()
+        # A second run is a no-op
+        migrate_affirmation_dates(legacy_engine)
+
+    def test_unparseable_date_is_rejected_without_changes(self, legacy_engine):
+        """Test that an unknown format stops the migration and leaves the table as it was."""
+        with legacy_engine.begin() as conn:
+            conn.execute(text("INSERT INTO affirmation_messages (id, user_id, message, date) "
+                              "VALUES (4, 1, 'd', 'sometime soon')"))
+        with pytest.raises(ValueError, match="id=4 date='sometime soon'"):
+            migrate_affirmation_dates(legacy_engine)
+        columns = {c["name"]: c["type"] for c in inspect(legacy_engine).get_columns("affirmation_messages")}
+        assert str(columns["date"]) == "VARCHAR"
+        with legacy_engine.connect() as conn:
+            assert conn.execute(text("SELECT date FROM affirmation_messages WHERE id = 1")).scalar() == "Oct 28, 2023"
+
+class TestDailyAffirmations:
+    """Tests for precomputed daily affirmations."""
+
+    def test_generation_is_idempotent_per_user_and_day(self, client, db_session):
+        """Test that every user gets one affirmation per day and reruns only fill gaps."""
+        for name in ["Ada", "Grace", "Linus"]:
+            client.post("/users", json={"name": name})
+        prompts = []
+
+        def flaky_completion(prompt):
+            prompts.append(prompt)
+            if "Grace" in prompt and len(prompts) <= 3:
+                return "An API error occurred: rate limited"
+            return "You are doing great."
+
+        day = date(2024, 5, 6)
+        assert generate_daily_affirmations(TestingSessionLocal, day=day, complete=flaky_completion) == 2
+        assert generate_daily_affirmations(TestingSessionLocal, day=day, complete=flaky_completion) == 1
+        assert generate_daily_affirmations(TestingSessionLocal, day=day, complete=flaky_completion) == 0
+        assert len(prompts) == 4
+        assert db_session.query(DailyAffirmation).filter(DailyAffirmation.date == day).count() == 3
+
+    def test_stored_count_excludes_rows_written_by_a_concurrent_run(self, client, db_session):
+        """Test that rows skipped by ON CONFLICT DO NOTHING are not reported as stored."""
+        for name in ["Ada", "Grace"]:
+            client.post("/users", json={"name": name})
+        day = date(2024, 5, 6)
+        ada = db_session.query(User).filter(User.name == "Ada").one()
+
+        def racing_completion(prompt):
+            if "Ada" in prompt:
+                # Another run stores Ada's affirmation while this one is generating it
+                other = TestingSessionLocal()
+                other.add(DailyAffirmation(user_id=ada.id, date=day, message="From the other run"))
+                other.commit()
+                other.close()
+            return "You are doing great."
+
+        assert generate_daily_affirmations(TestingSessionLocal, day=day, complete=racing_completion) == 1
+        assert db_session.query(DailyAffirmation).filter(DailyAffirmation.date == day).count() == 2
+
+    def test_no_llm_client_when_nothing_is_pending(self, client, db_session, monkeypatch):
+        """Test that a run with every user already done never sets up an LLM client."""
+        def no_client(model_name):
+            raise AssertionError("LLM client should not be configured")
+
+        monkeypatch.setattr(capstone_main, "_llm_completion", no_client)
+        assert generate_daily_affirmations(TestingSessionLocal, day=date(2024, 5, 6)) == 0
+
+    def test_get_todays_affirmation(self, client, test_user, db_session):
+        """Test that today's read serves the newest precomputed affirmation."""
+        today = date.today()
+        db_session.add_all([
+            DailyAffirmation(user_id=test_user.id, date=today - timedelta(days=1), message="Yesterday"),
+            DailyAffirmation(user_id=test_user.id, date=today, message="Today"),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/users/{test_user.id}/affirmations/today")
+        assert response.status_code == 200
+        assert response.json() == {"user_id": test_user.id, "date": today.isoformat(), "message": "Today"}
+
+    def test_get_todays_affirmation_not_generated(self, client, test_user):
+        """Test the 404s for an unknown user and for a user without affirmations."""
+        assert client.get("/users/9999/affirmations/today").json() == {"detail": "User not found"}
+        response = client.get(f"/users/{test_user.id}/affirmations/today")
+        assert response.status_code == 404
+        assert response.json() == {"detail": "No affirmation has been generated yet"}
+
+class TestMetricsEndpoint:
+    """Tests for the /metrics endpoint."""
+
+    def test_metrics_records_route_template(self, client, test_user):
+        """Test that requests are reported per route template in Prometheus format."""
+        client.get(f"/users/{test_user.id}")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_requests_total{method="GET",route="/users/{user_id}",status="200"}' in response.text
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+class TestRequestProfiler:
+    """Tests for the opt-in per-request profiler."""
+
+    @pytest.fixture
+    def profiled_client(self):
+        profiled_app = FastAPI()
+        install_profiler(profiled_app, engine, token="secret")
+
+        @profiled_app.get("/items/{item_id}")
+        def read_item(item_id: int):
+            with engine.connect() as conn:
+                return {"value": conn.execute(text("SELECT :v"), {"v": item_id}).scalar()}
+
+        @profiled_app.get("/busy")
+        def busy():
+            # 200 ms of pure-Python CPU work on a threadpool thread, with no SQL
+            deadline, spins = time.perf_counter() + 0.2, 0
+            while time.perf_counter() < deadline:
+                spins += 1
+            return {"spins": spins}
+
+        with TestClient(profiled_app) as c:
+            yield c
+
+    def test_disabled_without_token(self, monkeypatch):
+        """Test that nothing is installed when no token is configured."""
+        monkeypatch.delenv("PROFILE_TOKEN", raising=False)
+        plain_app = FastAPI()
+        assert install_profiler(plain_app, engine) is None
+        assert plain_app.user_middleware == []
+
+    def test_profile_captured_on_demand(self, profiled_client):
+        """Test that an authorized request is profiled and retrievable from the admin endpoint."""
+        assert "x-profile-id" not in profiled_client.get("/items/1").headers
+        assert "x-profile-id" not in profiled_client.get("/items/1", headers={"X-Profile-Token": "wrong"}).headers
+
+        response = profiled_client.get("/items/7", headers={"X-Profile-Token": "secret"})
+        assert response.json() == {"value": 7}
+        profile_id = response.headers["x-profile-id"]
+
+        assert profiled_client.get(f"/admin/profiles/{profile_id}").status_code == 403
+        profile = profiled_client.get(f"/admin/profiles/{profile_id}", headers={"X-Profile-Token": "secret"}).json()
+        assert profile["route"] == "/items/{item_id}"
+        assert profile["status"] == 200
+        assert profile["db"]["queries"] == 1
+        assert profile["db"]["slowest"][0]["statement"] == "SELECT ?"
+        summaries = profiled_client.get("/admin/profiles", headers={"X-Profile-Token": "secret"}).json()
+        assert [s["id"] for s in summaries] == [profile_id]
+
+    def test_sync_endpoint_cpu_time_is_attributed(self, profiled_client):
+        """Test that a sync endpoint's worker thread is sampled even when it runs no SQL."""
+        response = profiled_client.get("/busy", headers={"X-Profile-Token": "secret"})
+        profile_id = response.headers["x-profile-id"]
+        profile = profiled_client.get(f"/admin/profiles/{profile_id}", headers={"X-Profile-Token": "secret"}).json()
+        # Samples are weighted by elapsed time, so GIL contention does not shrink the total
+        assert profile["breakdown_ms"].get("app", 0) >= 100
+        assert any("busy (test_main.py" in s["stack"] for s in profile["stacks"])
+
+    def test_tracked_thread_is_released_when_work_finishes(self):
+        """Test that a worker thread is only sampled while it runs the request's code."""
+        profile = RequestProfile("GET", "/", 0.001)
+        seen = []
+        worker = threading.Thread(target=profile.track(lambda: seen.append(set(profile.threads))))
+        worker.start()
+        worker.join()
+        assert worker.ident in seen[0]
+        assert set(profile.threads) == {threading.get_ident()}
@@ -0,0 +1,65 @@
+"""
+Load benchmark for the refactor MCP server.
+
+Opens several concurrent MCP client sessions against a running server and
+measures tool calls/sec and per-call latency percentiles, both for individual
+calls and for the same calls sent through the `batch` tool.
+
+Start the server first, e.g.:
+    python main.py --workers 4
+then run:
+    python load_benchmark.py --clients 32 --calls 200 --batch-size 20
+"""
+import argparse
+import asyncio
+import time
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+async def run_client(url, calls, batch_size, latencies, distinct_args):
+    """One client session issuing `calls` tool calls, singly or in batches."""
+    async with streamablehttp_client(url) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            for start in range(0, calls, batch_size):
+                args = [{"a": i % distinct_args, "b": 7} for i in range(start, min(start + batch_size, calls))]
+                began = time.perf_counter()
+                if batch_size == 1:
+                    await session.call_tool("add", args[0])
+                else:
+                    await session.call_tool("batch", {"calls": [{"tool": "add", "arguments": a} for a in args]})
+                latencies.append(time.perf_counter() - began)
+
+async def run_load(url, clients, calls, batch_size, distinct_args):
+    latencies = []
+    began = time.perf_counter()
+    await asyncio.gather(*(run_client(url, calls, batch_size, latencies, distinct_args) for _ in range(clients)))
+    elapsed = time.perf_counter() - began
+    total_calls = clients * calls
+    print(f"batch size {batch_size:>3}: {total_calls / elapsed:10,.0f} tool calls/sec | "
+          f"request latency p50 {percentile(latencies, 50) * 1000:7.1f} ms, "
+          f"p95 {percentile(latencies, 95) * 1000:7.1f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:7.1f} ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure MCP tool throughput under concurrent clients.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/mcp")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=100, help="Tool calls per client.")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--distinct-args", type=int, default=1000,
+                        help="Distinct argument sets; fewer means more result-cache hits.")
+    args = parser.parse_args()
+
+    await run_load(args.url, args.clients, args.calls, 1, args.distinct_args)
+    if args.batch_size > 1:
+        await run_load(args.url, args.clients, args.calls, args.batch_size, args.distinct_args)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,35 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+from collections import OrderedDict
+
 from mcp.server.fastmcp import FastMCP
-mcp = FastMCP("refactor")
+
+# Stateless HTTP keeps no per-session state in the process, so any worker can
+# serve any request and the server can run behind multiple uvicorn workers.
+STATELESS_HTTP = os.getenv("MCP_STATELESS_HTTP", "0") == "1"
+mcp = FastMCP("refactor", stateless_http=STATELESS_HTTP, json_response=STATELESS_HTTP)
+
+# --- Result cache for pure tools ---
+TOOL_CACHE_SIZE = int(os.getenv("MCP_TOOL_CACHE_SIZE", "4096"))
+_tool_cache = OrderedDict()
+
+def pure_tool(fn):
+    """Caches results of a side-effect-free async tool, keyed on its arguments (LRU, per worker)."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        key = (fn.__name__, json.dumps([args, kwargs], sort_keys=True, default=str))
+        if key in _tool_cache:
+            _tool_cache.move_to_end(key)
+            return _tool_cache[key]
+        result = await fn(*args, **kwargs)
+        _tool_cache[key] = result
+        if len(_tool_cache) > TOOL_CACHE_SIZE:
+            _tool_cache.popitem(last=False)
+        return result
+    return wrapper
 
 @mcp.prompt()
 def refactor_code_prompt(code_to_refactor: str) -> str:
@@ -25,14 +55,66 @@ def refactor_code_prompt(code_to_refactor: str) -> str:
 </response>
 """
 @mcp.tool()
+@pure_tool
 async def add(a: int, b: int) -> int:
     """Add two numbers"""
     return a + b
 
 @mcp.tool()
+@pure_tool
 async def multiply(a: int, b: int) -> int:
     """Multiply two numbers"""
     return a * b
 
+# Tools that may be invoked through `batch`
+BATCHABLE_TOOLS = {"add", "multiply"}
+
+async def call_tool_value(name, arguments):
+    """
+    Calls a tool through the public FastMCP.call_tool, so arguments are
+    validated and coerced exactly as for a direct call, and returns its value.
+    """
+    result = await mcp.call_tool(name, arguments)
+    content, structured = result if isinstance(result, tuple) else (result, None)
+    if structured is not None:
+        # Non-object return values are wrapped as {"result": value}
+        return structured.get("result", structured)
+    texts = [block.text for block in content if hasattr(block, "text")]
+    return texts[0] if len(texts) == 1 else texts
+
+@mcp.tool()
+async def batch(calls: list[dict]) -> list[dict]:
+    """
+    Run many tool calls in one request, concurrently.
+    :param calls: List of {"tool": name, "arguments": {...}}.
+    :return: One {"result": ...} or {"error": ...} per call, in order.
+    """
+    async def run(call):
+        name = call.get("tool")
+        if name not in BATCHABLE_TOOLS:
+            return {"error": f"Unknown tool '{name}'"}
+        try:
+            return {"result": await call_tool_value(name, call.get("arguments", {}))}
+        except Exception as e:
+            return {"error": str(e)}
+    return await asyncio.gather(*(run(call) for call in calls))
+
+# ASGI app for running under uvicorn directly, e.g. `uvicorn main:app --workers 4`
+# with MCP_STATELESS_HTTP=1.
+app = mcp.streamable_http_app()
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the refactor MCP server over streamable HTTP.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes; >1 implies stateless HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    if args.workers > 1:
+        import uvicorn
+        # Workers re-import this module, so the mode is passed through the environment.
+        os.environ["MCP_STATELESS_HTTP"] = "1"
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)))
+    else:
+        mcp.settings.host, mcp.settings.port = args.host, args.port
+        mcp.run(transport="streamable-http")
@@ -0,0 +1,179 @@
+# --- Admission Control & Rate Limiting for the FastAPI Services ---
+# Description: ASGI middleware that applies a token-bucket rate limit per API
+#              key (or client IP), caps concurrent requests per route class
+#              (cheap reads, writes, LLM-backed endpoints) and sheds load fast
+#              with 429/503 plus Retry-After once queueing would exceed a
+#              deadline. Rate-limit state can be shared across workers through
+#              a local SQLite file.
+#
+# Usage: install_admission_control(app, llm_prefixes=["/chat"])
+# Configuration (environment): ADMISSION_RATE_PER_SEC, ADMISSION_BURST,
+#              ADMISSION_STORE (SQLite path for state shared across workers).
+# -----------------------------------------------------------------
+
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# Concurrency cap per worker process and the longest a request may wait for a slot.
+ROUTE_CLASSES = {
+    "read":  {"max_concurrency": 64, "max_queue_wait": 0.5},
+    "write": {"max_concurrency": 16, "max_queue_wait": 0.5},
+    "llm":   {"max_concurrency": 4,  "max_queue_wait": 2.0},
+}
+EXEMPT_PATHS = ("/metrics",)
+
+
+# --- Token Bucket Stores ---
+# take(key, rate, burst) -> seconds to wait before a token is available (0.0 if one was taken).
+
+class MemoryTokenBucketStore:
+    """Per-process token buckets."""
+
+    blocking = False
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+
+class SQLiteTokenBucketStore:
+    """Token buckets in a local SQLite file, shared by every worker on the host."""
+
+    blocking = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                         "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, rate, burst):
+        conn = self._connect()
+        now = time.time()
+        # BEGIN IMMEDIATE serializes the read-modify-write across processes.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if tokens >= 1:
+                tokens -= 1
+            conn.execute("INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                         (key, tokens, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+# --- ASGI Middleware ---
+
+async def _reject(send, status, detail, retry_after):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """Rate limits per client, then admits the request into its route class or sheds it."""
+
+    def __init__(self, app, rate=None, burst=None, store=None, route_classes=None, llm_prefixes=(),
+                 api_key_header="x-api-key"):
+        self.app = app
+        self.rate = rate if rate is not None else float(os.getenv("ADMISSION_RATE_PER_SEC", "50"))
+        self.burst = burst if burst is not None else float(os.getenv("ADMISSION_BURST", "100"))
+        store_path = os.getenv("ADMISSION_STORE")
+        self.store = store or (SQLiteTokenBucketStore(store_path) if store_path else MemoryTokenBucketStore())
+        self.route_classes = route_classes or ROUTE_CLASSES
+        self.llm_prefixes = tuple(llm_prefixes)
+        self.api_key_header = api_key_header.lower().encode()
+        self._semaphores = {}
+
+    def classify(self, scope):
+        """Returns the route class for a request: 'llm', 'read' or 'write'."""
+        if self.llm_prefixes and scope["path"].startswith(self.llm_prefixes):
+            return "llm"
+        return "read" if scope["method"] in ("GET", "HEAD", "OPTIONS") else "write"
+
+    def client_key(self, scope):
+        for name, value in scope.get("headers", ()):
+            if name == self.api_key_header:
+                return "key:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def _semaphore(self, route_class):
+        # Created lazily so it binds to the running event loop.
+        semaphore = self._semaphores.get(route_class)
+        if semaphore is None:
+            semaphore = self._semaphores[route_class] = asyncio.Semaphore(
+                self.route_classes[route_class]["max_concurrency"])
+        return semaphore
+
+    async def __call__(self, scope, receive, send):
+        # CORS preflights carry no work and must not spend the client's tokens.
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.client_key(scope)
+        if self.store.blocking:
+            wait = await asyncio.to_thread(self.store.take, key, self.rate, self.burst)
+        else:
+            wait = self.store.take(key, self.rate, self.burst)
+        if wait > 0:
+            await _reject(send, 429, "Rate limit exceeded", wait)
+            return
+
+        route_class = self.classify(scope)
+        config = self.route_classes[route_class]
+        semaphore = self._semaphore(route_class)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=config["max_queue_wait"])
+        except asyncio.TimeoutError:
+            await _reject(send, 503, f"Server busy ({route_class} capacity reached)", config["max_queue_wait"])
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            semaphore.release()
+
+
+def install_admission_control(app, **options):
+    """Adds admission control to a FastAPI app; options are passed to AdmissionControlMiddleware."""
+    app.add_middleware(AdmissionControlMiddleware, **options)
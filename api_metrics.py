@@ -0,0 +1,198 @@
+# --- Prometheus-Style Metrics for the FastAPI Services ---
+# Description: Low-overhead ASGI middleware recording per-route latency
+#              histograms, in-flight gauges and status counts, plus SQLAlchemy
+#              cursor listeners that account query count and time per request
+#              and log slow queries. Everything is served from /metrics in the
+#              Prometheus text exposition format.
+#
+# Usage: install_metrics(app, engine)
+# -----------------------------------------------------------------
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+
+logger = logging.getLogger("api_metrics")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SLOW_QUERY_SECONDS = 0.1
+
+
+# --- Metric Types ---
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for label_values, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, *label_values):
+        self.inc(*label_values, amount=-1)
+
+    def expose(self):
+        lines = super().expose()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help_text, labels, buckets
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        for label_values, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+REQUESTS_TOTAL = Counter("http_requests_total", "HTTP responses by route and status code.", ("method", "route", "status"))
+IN_FLIGHT = Gauge("http_requests_in_progress", "HTTP requests currently being served.", ("method",))
+REQUEST_QUERIES = Histogram("http_request_db_queries", "SQL queries issued per request.", ("method", "route"), QUERY_COUNT_BUCKETS)
+REQUEST_DB_TIME = Histogram("http_request_db_duration_seconds", "Time spent in SQL per request.", ("method", "route"))
+DB_QUERIES_TOTAL = Counter("db_queries_total", "SQL queries executed.")
+DB_SLOW_QUERIES_TOTAL = Counter("db_slow_queries_total", "SQL queries slower than the slow-query threshold.")
+
+METRICS = [REQUEST_LATENCY, REQUESTS_TOTAL, IN_FLIGHT, REQUEST_QUERIES, REQUEST_DB_TIME, DB_QUERIES_TOTAL, DB_SLOW_QUERIES_TOTAL]
+
+
+def register(metric):
+    """Adds a metric (Counter, Gauge or Histogram) to the /metrics output."""
+    METRICS.append(metric)
+    return metric
+
+
+def render_metrics():
+    """Returns all metrics in Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+# --- Per-Request SQL Accounting ---
+
+# Mutable [query_count, query_seconds] for the current request. Sync endpoints
+# run in a threadpool with a copy of the context, so the list is shared by
+# reference rather than reassigned.
+_request_db_stats = contextvars.ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine, slow_query_seconds=SLOW_QUERY_SECONDS):
+    """Attaches cursor listeners that count and time every query on engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        DB_QUERIES_TOTAL.inc()
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+        if elapsed >= slow_query_seconds:
+            DB_SLOW_QUERIES_TOTAL.inc()
+            logger.warning("Slow query (%.1f ms): %s | parameters=%r", elapsed * 1000, statement, parameters)
+
+
+# --- ASGI Middleware ---
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no per-request Request/Response objects) for low overhead."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec(method)
+            _request_db_stats.reset(token)
+            # FastAPI records the matched route in the scope; use its template to bound cardinality.
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.observe(elapsed, method, route_path)
+            REQUESTS_TOTAL.inc(method, route_path, str(status[0]))
+            REQUEST_QUERIES.observe(db_stats[0], method, route_path)
+            REQUEST_DB_TIME.observe(db_stats[1], method, route_path)
+
+
+def install_metrics(app, engine=None, path="/metrics", slow_query_seconds=SLOW_QUERY_SECONDS):
+    """Adds the metrics middleware, SQL listeners and the /metrics endpoint to a FastAPI app."""
+    app.add_middleware(MetricsMiddleware)
+    if engine is not None:
+        instrument_engine(engine, slow_query_seconds=slow_query_seconds)
+
+    @app.get(path, response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,12 +1,20 @@
 from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, Date
+from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, Date, Index, event, func, inspect, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
-from pydantic import BaseModel
-from typing import List, Optional
+from sqlalchemy.orm import sessionmaker, Session, relationship, column_property
+from pydantic import BaseModel, TypeAdapter
+from api_metrics import install_metrics
+from admission_control import install_admission_control
+from request_profiler import install_profiler
+from fast_json import DefaultJSONResponse, serialize_rows
+from typing import List, Optional, Any, Dict
+from datetime import datetime, date
+import asyncio
+import os
 
 # --- SQLAlchemy Setup ---
-SQLALCHEMY_DATABASE_URL = "sqlite:///./artifacts/onboarding.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("ONBOARDING_DATABASE_URL", "sqlite:///./artifacts/onboarding.db")
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -17,7 +25,9 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
-    role = Column(String)
+    # active_history loads the old value even when an expired attribute is
+    # overwritten, so _maintain_task_stats can always see what changed.
+    role = column_property(Column(String), active_history=True)
     tasks = relationship("OnboardingTask", back_populates="owner")
 
 class OnboardingTask(Base):
@@ -26,9 +36,30 @@ class OnboardingTask(Base):
     title = Column(String, index=True)
     description = Column(Text)
     due_date = Column(Date)
-    status = Column(String, default='Pending')
-    user_id = Column(Integer, ForeignKey('users.id'))
+    status = column_property(Column(String, default='Pending'), active_history=True)
+    user_id = column_property(Column(Integer, ForeignKey('users.id')), active_history=True)
     owner = relationship("User", back_populates="tasks")
+    # Serves per-user status and overdue lookups without a table scan
+    __table_args__ = (Index('ix_onboarding_tasks_user_status_due', 'user_id', 'status', 'due_date'),)
+
+# --- Aggregate Tables ---
+# Task counts by status, kept current in the same transaction as every task write
+# (see _maintain_task_stats) so dashboard reads are O(1) lookups.
+DEFAULT_TASK_STATUS = 'Pending'
+COMPLETED_TASK_STATUS = 'Completed'
+UNASSIGNED_ROLE = 'Unassigned'
+
+class UserTaskStats(Base):
+    __tablename__ = 'user_task_stats'
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class RoleTaskStats(Base):
+    __tablename__ = 'role_task_stats'
+    role = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
 # Create the database tables
 Base.metadata.create_all(bind=engine)
@@ -47,8 +78,134 @@ class UserSchema(UserBase):
     class Config:
         orm_mode = True
 
+# Prebuilt adapter for the fast list serialization path
+USER_LIST_ADAPTER = TypeAdapter(List[UserSchema])
+
+class TaskCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    due_date: Optional[date] = None
+    status: str = DEFAULT_TASK_STATUS
+
+class TaskUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    due_date: Optional[date] = None
+    status: Optional[str] = None
+
+class TaskSchema(TaskCreate):
+    id: int
+    user_id: Optional[int] = None
+    class Config:
+        orm_mode = True
+
+class ProgressSummary(BaseModel):
+    counts: Dict[str, int]
+    total: int
+    completed: int
+    completion_rate: float
+
+class RoleProgressSummary(ProgressSummary):
+    role: str
+
+class UserProgressSummary(ProgressSummary):
+    user_id: int
+    overdue: int
+
+class OverdueSummary(BaseModel):
+    user_id: int
+    overdue: int
+
+# --- Aggregate Maintenance ---
+def _original(obj, attr):
+    """Returns an attribute's value as of the start of the flush."""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(obj, attr)
+
+def _role_of(session, user_id):
+    if user_id is None:
+        return UNASSIGNED_ROLE
+    with session.no_autoflush:
+        user = session.get(User, user_id)
+    return (user.role if user else None) or UNASSIGNED_ROLE
+
+def _adjust_task_stats(conn, user_id, role, status, delta):
+    """Adds delta to the per-user and per-role counters with atomic upserts."""
+    status = status or DEFAULT_TASK_STATUS
+    if user_id is not None:
+        conn.execute(sqlite_insert(UserTaskStats)
+                     .values(user_id=user_id, status=status, count=delta)
+                     .on_conflict_do_update(index_elements=['user_id', 'status'],
+                                            set_={'count': UserTaskStats.count + delta}))
+    conn.execute(sqlite_insert(RoleTaskStats)
+                 .values(role=role, status=status, count=delta)
+                 .on_conflict_do_update(index_elements=['role', 'status'],
+                                        set_={'count': RoleTaskStats.count + delta}))
+
+# Bound to this app's sessionmaker, not the global Session class, so other
+# sessions in the process (job queue, other apps) don't pay for it.
+@event.listens_for(SessionLocal, "after_flush")
+def _maintain_task_stats(session, flush_context):
+    # after_flush runs inside the flush's transaction, with new ids assigned and
+    # attribute history still available, so counters commit or roll back with the write.
+    conn = session.connection()
+    for user in session.dirty:
+        if isinstance(user, User) and inspect(user).attrs.role.history.has_changes():
+            old_role = _original(user, 'role') or UNASSIGNED_ROLE
+            new_role = user.role or UNASSIGNED_ROLE
+            for status, count in conn.execute(select(UserTaskStats.status, UserTaskStats.count)
+                                              .where(UserTaskStats.user_id == user.id)).all():
+                _adjust_task_stats(conn, None, old_role, status, -count)
+                _adjust_task_stats(conn, None, new_role, status, count)
+    for task in session.new:
+        if isinstance(task, OnboardingTask):
+            _adjust_task_stats(conn, task.user_id, _role_of(session, task.user_id), task.status, 1)
+    for task in session.dirty:
+        if isinstance(task, OnboardingTask):
+            state = inspect(task).attrs
+            if state.status.history.has_changes() or state.user_id.history.has_changes():
+                old_user_id = _original(task, 'user_id')
+                _adjust_task_stats(conn, old_user_id, _role_of(session, old_user_id), _original(task, 'status'), -1)
+                _adjust_task_stats(conn, task.user_id, _role_of(session, task.user_id), task.status, 1)
+    for task in session.deleted:
+        if isinstance(task, OnboardingTask):
+            old_user_id = _original(task, 'user_id')
+            _adjust_task_stats(conn, old_user_id, _role_of(session, old_user_id), _original(task, 'status'), -1)
+
+def reconcile_task_stats(db: Session):
+    """Rebuilds the aggregate tables from the base tables, correcting any drift."""
+    status = func.coalesce(OnboardingTask.status, DEFAULT_TASK_STATUS)
+    role = func.coalesce(User.role, UNASSIGNED_ROLE)
+    db.query(UserTaskStats).delete()
+    db.query(RoleTaskStats).delete()
+    db.execute(insert(UserTaskStats).from_select(
+        ['user_id', 'status', 'count'],
+        select(OnboardingTask.user_id, status, func.count())
+        .where(OnboardingTask.user_id.isnot(None))
+        .group_by(OnboardingTask.user_id, status)))
+    db.execute(insert(RoleTaskStats).from_select(
+        ['role', 'status', 'count'],
+        select(role, status, func.count())
+        .select_from(OnboardingTask)
+        .outerjoin(User, OnboardingTask.user_id == User.id)
+        .group_by(role, status)))
+    db.commit()
+
+def _progress(counts):
+    counts = {status: count for status, count in counts if count}
+    total = sum(counts.values())
+    completed = counts.get(COMPLETED_TASK_STATUS, 0)
+    return {"counts": counts, "total": total, "completed": completed,
+            "completion_rate": round(completed / total, 4) if total else 0.0}
+
 # --- FastAPI App ---
-app = FastAPI()
+app = FastAPI(default_response_class=DefaultJSONResponse)
+# Middleware added last runs first: metrics also see requests shed by admission control.
+install_admission_control(app, llm_prefixes=["/chat"])
+install_metrics(app, engine)
+install_profiler(app, engine)
 
 # --- Dependency ---
 def get_db():
@@ -72,8 +229,8 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 @app.get("/users/", response_model=List[UserSchema])
 def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    rows = db.query(User.id, User.email, User.name, User.role).offset(skip).limit(limit).all()
+    return serialize_rows(USER_LIST_ADAPTER, rows)
 
 @app.get("/users/{user_id}", response_model=UserSchema)
 def read_user(user_id: int, db: Session = Depends(get_db)):
@@ -82,7 +239,93 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
-from utils import setup_llm_client
+# --- Onboarding Task Endpoints ---
+@app.post("/users/{user_id}/tasks", response_model=TaskSchema)
+def create_task(user_id: int, task: TaskCreate, db: Session = Depends(get_db)):
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_task = OnboardingTask(**task.dict(), user_id=user_id)
+    db.add(db_task)
+    db.commit()
+    db.refresh(db_task)
+    return db_task
+
+@app.patch("/tasks/{task_id}", response_model=TaskSchema)
+def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db)):
+    db_task = db.get(OnboardingTask, task_id)
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    for field, value in task.dict(exclude_unset=True).items():
+        setattr(db_task, field, value)
+    db.commit()
+    db.refresh(db_task)
+    return db_task
+
+@app.delete("/tasks/{task_id}", response_model=TaskSchema)
+def delete_task(task_id: int, db: Session = Depends(get_db)):
+    db_task = db.get(OnboardingTask, task_id)
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    db.delete(db_task)
+    db.commit()
+    return db_task
+
+# --- Progress Summary Endpoints ---
+@app.get("/summary/roles", response_model=List[RoleProgressSummary])
+def role_summaries(db: Session = Depends(get_db)):
+    by_role = {}
+    for role, status, count in db.query(RoleTaskStats.role, RoleTaskStats.status, RoleTaskStats.count):
+        by_role.setdefault(role, []).append((status, count))
+    summaries = [{"role": role, **_progress(counts)} for role, counts in sorted(by_role.items())]
+    return [summary for summary in summaries if summary["total"]]
+
+@app.get("/summary/users/{user_id}", response_model=UserProgressSummary)
+def user_summary(user_id: int, db: Session = Depends(get_db)):
+    if db.get(User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    counts = db.query(UserTaskStats.status, UserTaskStats.count).filter(UserTaskStats.user_id == user_id).all()
+    overdue = (db.query(func.count(OnboardingTask.id))
+               .filter(OnboardingTask.user_id == user_id,
+                       OnboardingTask.status != COMPLETED_TASK_STATUS,
+                       OnboardingTask.due_date < date.today())
+               .scalar())
+    return {"user_id": user_id, "overdue": overdue, **_progress(counts)}
+
+@app.get("/summary/overdue", response_model=List[OverdueSummary])
+def overdue_summary(db: Session = Depends(get_db)):
+    rows = (db.query(OnboardingTask.user_id, func.count(OnboardingTask.id))
+            .filter(OnboardingTask.user_id.isnot(None),
+                    OnboardingTask.status != COMPLETED_TASK_STATUS,
+                    OnboardingTask.due_date < date.today())
+            .group_by(OnboardingTask.user_id)
+            .all())
+    return [{"user_id": user_id, "overdue": overdue} for user_id, overdue in rows]
+
+# --- Aggregate Reconciliation ---
+RECONCILE_INTERVAL_SECONDS = float(os.getenv("AGGREGATE_RECONCILE_SECONDS", "3600"))
+
+def run_reconciliation():
+    db = SessionLocal()
+    try:
+        reconcile_task_stats(db)
+    finally:
+        db.close()
+
+async def reconcile_periodically():
+    while True:
+        await asyncio.to_thread(run_reconciliation)
+        await asyncio.sleep(RECONCILE_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+async def start_reconciliation():
+    app.state.reconcile_task = asyncio.create_task(reconcile_periodically())
+
+@app.on_event("shutdown")
+async def stop_reconciliation():
+    app.state.reconcile_task.cancel()
+
+from utils import setup_llm_client, get_completion, is_error_response
+from job_queue import JobQueue
 
 class ChatRequest(BaseModel):
     question: str
@@ -94,3 +337,71 @@ def chat(request: ChatRequest, db: Session = Depends(get_db)):
     # For now, we will just return the question
     answer = f"Echo: {question} (This is a mock response. Replace with LangGraph agent output.)"
     return {"response": answer}
+
+
+# --- Async Generation Jobs ---
+GENERATION_PROMPTS = {
+    "prd": "Write a complete Product Requirements Document in Markdown for the following product idea:\n\n{input}",
+    "architecture": "Write a software architecture document in Markdown, including components, data flow and key decisions, for:\n\n{input}",
+    "tests": "Write a comprehensive pytest test suite for the following code. Return only Python code.\n\n{input}",
+}
+
+def make_generation_handler(kind):
+    """Builds a job handler that runs one long LLM generation."""
+    def handler(payload, report_progress):
+        client, model_name, api_provider = setup_llm_client(payload.get("model", "gpt-4.1"))
+        if client is None:
+            raise RuntimeError("LLM client could not be configured.")
+        report_progress(0.1)
+        prompt = GENERATION_PROMPTS[kind].format(input=payload.get("input", ""))
+        content = get_completion(prompt, client, model_name, api_provider)
+        # get_completion reports failures as strings; raise so the job is marked failed.
+        if is_error_response(content):
+            raise RuntimeError(content)
+        return {"content": content}
+    return handler
+
+job_queue = JobQueue(
+    engine,
+    handlers={kind: make_generation_handler(kind) for kind in GENERATION_PROMPTS},
+    concurrency=int(os.getenv("JOB_CONCURRENCY", "2")),
+)
+
+class JobCreate(BaseModel):
+    kind: str
+    payload: dict = {}
+    priority: int = 0
+
+class JobSchema(BaseModel):
+    id: int
+    kind: str
+    status: str
+    priority: int
+    progress: float
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+@app.on_event("startup")
+async def start_job_workers():
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_queue.stop()
+
+@app.post("/jobs", response_model=JobSchema, status_code=202)
+def create_job(job: JobCreate):
+    try:
+        return job_queue.enqueue(job.kind, job.payload, priority=job.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/jobs/{job_id}", response_model=JobSchema)
+def read_job(job_id: int):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+# app.main binds its engine at import time; point it at a throwaway database first.
+_db_dir = tempfile.mkdtemp(prefix="onboarding_test_")
+os.environ.setdefault("ONBOARDING_DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'onboarding.db')}")
+
+
+@pytest.fixture
+def main_module():
+    import app.main
+    return app.main
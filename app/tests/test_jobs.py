@@ -0,0 +1,54 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(main_module, monkeypatch):
+    monkeypatch.setattr(main_module.job_queue, "poll_interval", 0.05)
+    with TestClient(main_module.app) as c:
+        yield c
+
+
+def _wait_for(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestJobEndpoints:
+    """Tests for the /jobs endpoints."""
+
+    def test_generation_job_succeeds(self, client, main_module, monkeypatch):
+        monkeypatch.setattr(main_module, "setup_llm_client", lambda model: (object(), model, "openai"))
+        monkeypatch.setattr(main_module, "get_completion", lambda prompt, *args: "# PRD\nA great product.")
+        response = client.post("/jobs", json={"kind": "prd", "payload": {"input": "todo app"}})
+        assert response.status_code == 202
+        # The worker may claim the job before the response is serialized.
+        assert response.json()["status"] in ("queued", "running")
+
+        job = _wait_for(client, response.json()["id"])
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"content": "# PRD\nA great product."}
+
+    def test_api_error_marks_job_failed(self, client, main_module, monkeypatch):
+        monkeypatch.setattr(main_module, "setup_llm_client", lambda model: (object(), model, "openai"))
+        monkeypatch.setattr(main_module, "get_completion", lambda prompt, *args: "An API error occurred: 429")
+        job_id = client.post("/jobs", json={"kind": "tests", "payload": {"input": "def f(): pass"}}).json()["id"]
+
+        job = _wait_for(client, job_id)
+        assert job["status"] == "failed"
+        assert job["error"] == "An API error occurred: 429"
+        assert job["result"] is None
+
+    def test_unknown_kind_rejected(self, client):
+        response = client.post("/jobs", json={"kind": "poem"})
+        assert response.status_code == 400
+
+    def test_job_not_found(self, client):
+        assert client.get("/jobs/999999").status_code == 404
@@ -0,0 +1,96 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def db(main_module):
+    m = main_module
+    session = m.SessionLocal()
+    for model in (m.UserTaskStats, m.RoleTaskStats, m.OnboardingTask, m.User):
+        session.query(model).delete()
+    session.commit()
+    yield session
+    session.close()
+
+
+def _snapshot(m, session):
+    users = {(row.user_id, row.status): row.count
+             for row in session.execute(select(m.UserTaskStats)).scalars() if row.count}
+    roles = {(row.role, row.status): row.count
+             for row in session.execute(select(m.RoleTaskStats)).scalars() if row.count}
+    return users, roles
+
+
+def _assert_matches_reconciled(m, session):
+    """The incrementally maintained counters must equal a full rebuild."""
+    session.expire_all()
+    incremental = _snapshot(m, session)
+    m.reconcile_task_stats(session)
+    assert incremental == _snapshot(m, session)
+    return incremental
+
+
+class TestIncrementalTaskStats:
+
+    def test_create_update_reassign_and_delete(self, main_module, db):
+        m = main_module
+        alice = m.User(name="Alice", email="alice@example.com", role="Engineer")
+        bob = m.User(name="Bob", email="bob@example.com", role="Designer")
+        db.add_all([alice, bob])
+        db.commit()
+
+        tasks = [m.OnboardingTask(title=f"Task {i}", user_id=alice.id, due_date=date(2024, 1, i + 1))
+                 for i in range(3)]
+        db.add_all(tasks)
+        db.add(m.OnboardingTask(title="Unowned"))
+        db.commit()
+        users, roles = _assert_matches_reconciled(m, db)
+        assert users == {(alice.id, "Pending"): 3}
+        assert roles == {("Engineer", "Pending"): 3, ("Unassigned", "Pending"): 1}
+
+        tasks[0].status = "Completed"
+        db.commit()
+        _assert_matches_reconciled(m, db)
+
+        tasks[1].user_id = bob.id
+        tasks[2].user_id, tasks[2].status = bob.id, "In Progress"
+        db.commit()
+        users, roles = _assert_matches_reconciled(m, db)
+        assert users == {(alice.id, "Completed"): 1, (bob.id, "Pending"): 1, (bob.id, "In Progress"): 1}
+
+        alice.role = "Manager"
+        db.commit()
+        users, roles = _assert_matches_reconciled(m, db)
+        assert roles[("Manager", "Completed")] == 1 and ("Engineer", "Completed") not in roles
+
+        db.delete(tasks[2])
+        db.commit()
+        users, roles = _assert_matches_reconciled(m, db)
+        assert (bob.id, "In Progress") not in users
+
+    def test_rollback_leaves_counters_unchanged(self, main_module, db):
+        m = main_module
+        user = m.User(name="Carol", email="carol@example.com", role="Engineer")
+        db.add(user)
+        db.commit()
+        db.add(m.OnboardingTask(title="Draft", user_id=user.id))
+        db.flush()
+        db.rollback()
+        assert _assert_matches_reconciled(m, db) == ({}, {})
+
+    def test_listener_is_scoped_to_the_app_sessionmaker(self, main_module, db):
+        m = main_module
+        other = Session(bind=m.engine)
+        try:
+            user = m.User(name="Dan", email="dan@example.com", role="Engineer")
+            other.add(user)
+            other.commit()
+            other.add(m.OnboardingTask(title="Outside", user_id=user.id))
+            other.commit()
+        finally:
+            other.close()
+        db.expire_all()
+        assert _snapshot(m, db) == ({}, {})
@@ -0,0 +1,73 @@
+# --- Import-Time Benchmark ---
+# Description: Measures cold-start import cost with `python -X importtime` and
+#              fails if it exceeds a budget, so CLI and worker processes that
+#              only need setup_llm_client stay fast to start.
+#
+# Usage: python benchmarks/import_time.py [--budget-ms 50] [--statement "..."]
+# -----------------------------------------------------------------
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_STATEMENT = "from utils import setup_llm_client"
+DEFAULT_BUDGET_MS = 50.0
+
+# "import time:  self [us] | cumulative | imported package"
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(statement, runs=5):
+    """Returns (best wall-clock ms, slowest top-level imports) over several cold runs."""
+    baseline = _run("pass")[1]
+    best_total, best_imports = None, None
+    for _ in range(runs):
+        total, imports = _run(statement)
+        if best_total is None or total < best_total:
+            best_total = total
+            best_imports = {name: us for name, us in imports.items() if name not in baseline}
+    slowest = sorted(best_imports.items(), key=lambda item: item[1], reverse=True)[:10]
+    return best_total, slowest
+
+
+def _run(statement):
+    """
+    Runs statement in a fresh interpreter. Returns its wall-clock time in ms and
+    the cumulative microseconds of each top-level import it triggered.
+    """
+    timed = f"import time as _t; _s = _t.perf_counter()\n{statement}\nprint((_t.perf_counter() - _s) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", timed],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        # Only un-indented entries; nested imports are included in their parent's cumulative time.
+        if match and len(match.group(3)) == 1:
+            imports[match.group(4)] = imports.get(match.group(4), 0) + int(match.group(2))
+    return float(result.stdout.strip().splitlines()[-1]), imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold-start import time against a budget.")
+    parser.add_argument("--statement", default=DEFAULT_STATEMENT)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    total, slowest = measure(args.statement, runs=args.runs)
+    print(f"{args.statement!r}: {total:.1f} ms (budget {args.budget_ms:.1f} ms)")
+    for name, us in slowest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    if total > args.budget_ms:
+        print("❌ Import-time budget exceeded.")
+        sys.exit(1)
+    print("✅ Within import-time budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# --- Serialization Microbenchmark ---
+# Description: Compares rows/sec serialized by the original list-endpoint path
+#              (ORM entities -> response_model validation -> dict -> stdlib json)
+#              with the fast path (row tuples -> prebuilt TypeAdapter -> JSON bytes).
+#
+# Usage: python benchmarks/serialization.py [--rows 20000] [--runs 5]
+# -----------------------------------------------------------------
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Capstone.main import Base, User, AffirmationMessage, AFFIRMATION_LIST_ADAPTER
+
+
+def _seed(session, rows):
+    user = User(name="Benchmark User")
+    session.add(user)
+    session.flush()
+    session.bulk_insert_mappings(AffirmationMessage, [
+        {"user_id": user.id, "message": f"Affirmation number {i}", "category": "Positivity" if i % 2 else None,
+         "date": date(2024, 1, 1)}
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def orm_path(session):
+    """What FastAPI does for response_model=List[AffirmationRead] given ORM objects."""
+    entities = session.query(AffirmationMessage).all()
+    validated = AFFIRMATION_LIST_ADAPTER.validate_python(entities, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_path(session):
+    """The serialize_rows path used by GET /messages."""
+    rows = session.query(
+        AffirmationMessage.id,
+        AffirmationMessage.user_id,
+        AffirmationMessage.message,
+        AffirmationMessage.category,
+        AffirmationMessage.date,
+    ).all()
+    return AFFIRMATION_LIST_ADAPTER.dump_json(AFFIRMATION_LIST_ADAPTER.validate_python(rows, from_attributes=True))
+
+
+def bench(SessionLocal, fn, rows, runs):
+    """Returns the best rows/sec over several runs, each with a fresh session."""
+    best = float("inf")
+    for _ in range(runs):
+        session = SessionLocal()
+        start = time.perf_counter()
+        fn(session)
+        best = min(best, time.perf_counter() - start)
+        session.close()
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list-endpoint serialization.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    session = SessionLocal()
+    _seed(session, args.rows)
+    session.close()
+
+    assert json.loads(orm_path(SessionLocal())) == json.loads(fast_path(SessionLocal()))
+    before = bench(SessionLocal, orm_path, args.rows, args.runs)
+    after = bench(SessionLocal, fast_path, args.rows, args.runs)
+    print(f"ORM + response_model + json: {before:12,.0f} rows/sec")
+    print(f"Row tuples + TypeAdapter:    {after:12,.0f} rows/sec  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
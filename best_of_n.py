@@ -0,0 +1,193 @@
+# --- Best-of-N Code Generation with Sandboxed Tests ---
+# Description: Requests N candidate implementations concurrently, extracts the
+#              code from each response, runs every candidate against a pytest
+#              file in its own subprocess (temp directory, CPU/memory/time
+#              limits), and returns the fastest passing candidate, optionally
+#              ranked by a microbenchmark. Replaces the generate-inspect-retry
+#              loop with one parallel step whose latency is bounded by the
+#              slowest generation plus the test timeout.
+#
+# Usage: python best_of_n.py spec.md --tests test_slugify.py --module generated_function \
+#            --n 5 --models gpt-4.1-mini gemini-2.5-flash --benchmark "slugify('Hello World' * 50)"
+# The test file imports the candidate as `--module` (e.g. `from generated_function import slugify`).
+# -----------------------------------------------------------------
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: candidates run without CPU/memory limits
+    resource = None
+
+from utils import setup_llm_client, get_completion, save_artifact, is_error_response
+
+CODE_PROMPT = """{spec}
+
+Write the implementation as a single self-contained Python module. It will be saved as
+`{module}.py` and tested with pytest. Return only one ```python code block."""
+
+_CODE_BLOCK = re.compile(r"```(?:python|py)?[ \t]*\n(.*?)```", re.DOTALL)
+
+# argv: cpu_seconds memory_mb command...; the limits survive the exec into the command.
+_LIMITS_BOOTSTRAP = """
+import os, resource, sys
+cpu_seconds, memory = int(sys.argv[1]), int(sys.argv[2]) * 1024 * 1024
+resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+os.execv(sys.argv[3], sys.argv[3:])
+"""
+
+_BENCHMARK_SCRIPT = """
+import timeit
+from {module} import *
+print(min(timeit.repeat({statement!r}, globals=globals(), number={number}, repeat=3)) / {number})
+"""
+
+
+def extract_code(response):
+    """Returns the Python code in an LLM response (the longest fenced block), or None if it does not compile."""
+    blocks = _CODE_BLOCK.findall(response)
+    code = max(blocks, key=len) if blocks else response
+    code = code.strip() + "\n"
+    try:
+        compile(code, "<candidate>", "exec")
+    except SyntaxError:
+        return None
+    return code
+
+
+def _limited_command(args, cpu_seconds, memory_mb):
+    """
+    Prefixes a command with a bootstrap that applies CPU-time and address-space
+    limits inside the child and then execs the command (POSIX only). Unlike a
+    preexec_fn, nothing runs between fork and exec in this threaded process.
+    """
+    if resource is None:
+        return args
+    return [sys.executable, "-c", _LIMITS_BOOTSTRAP, str(cpu_seconds), str(memory_mb), *args]
+
+
+def _run_sandboxed(args, cwd, timeout, cpu_seconds, memory_mb):
+    """Runs a command in cwd with a minimal environment; returns (returncode, output, seconds)."""
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONDONTWRITEBYTECODE": "1", "PYTHONHASHSEED": "0"}
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(_limited_command(args, cpu_seconds, memory_mb), cwd=cwd, env=env,
+                                   capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, f"Timed out after {timeout}s", time.perf_counter() - start
+    output = completed.stdout + completed.stderr
+    if completed.returncode < 0:
+        output += f"\nKilled by signal {-completed.returncode} (CPU or memory limit)"
+    return completed.returncode, output, time.perf_counter() - start
+
+
+def evaluate_candidate(code, tests_path, module="generated_function", benchmark=None, benchmark_number=100,
+                       timeout=30, cpu_seconds=20, memory_mb=1024):
+    """
+    Runs one candidate against the pytest file in an isolated temp directory.
+    Returns {"passed", "test_seconds", "benchmark_seconds", "output"}; the
+    benchmark only runs for candidates that pass.
+    """
+    workdir = tempfile.mkdtemp(prefix="best_of_n_")
+    try:
+        with open(os.path.join(workdir, f"{module}.py"), "w", encoding="utf-8") as f:
+            f.write(code)
+        shutil.copy(tests_path, workdir)
+        returncode, output, seconds = _run_sandboxed(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", os.path.basename(tests_path)],
+            workdir, timeout, cpu_seconds, memory_mb)
+        result = {"passed": returncode == 0, "test_seconds": round(seconds, 3), "benchmark_seconds": None,
+                  "output": output[-2000:]}
+        if result["passed"] and benchmark:
+            script = _BENCHMARK_SCRIPT.format(module=module, statement=benchmark, number=benchmark_number)
+            returncode, output, _ = _run_sandboxed([sys.executable, "-c", script], workdir,
+                                                   timeout, cpu_seconds, memory_mb)
+            if returncode == 0:
+                result["benchmark_seconds"] = float(output.strip().splitlines()[-1])
+            else:
+                result["output"] += f"\nBenchmark failed: {output[-500:]}"
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def generate_candidates(prompt, n=5, models=("gpt-4.1-mini",), temperature=0.8, max_workers=None):
+    """Requests n completions concurrently, cycling through models; returns [(model, response)]."""
+    clients = {name: setup_llm_client(name) for name in set(models)}
+    assignments = [models[i % len(models)] for i in range(n)]
+
+    def generate(model):
+        client, model_name, api_provider = clients[model]
+        return model, get_completion(prompt, client, model_name, api_provider, temperature=temperature)
+
+    with ThreadPoolExecutor(max_workers=max_workers or n) as executor:
+        return list(executor.map(generate, assignments))
+
+
+def best_of_n(spec, tests_path, module="generated_function", n=5, models=("gpt-4.1-mini",), benchmark=None,
+              temperature=0.8, test_workers=None, timeout=30, cpu_seconds=20, memory_mb=1024):
+    """
+    Generates n candidates for spec and tests them in parallel. Returns
+    (best, candidates): best is the passing candidate with the lowest
+    benchmark time (or test time without a benchmark), or None if none pass.
+    Each candidate is a dict with "index", "model", "code" and the
+    evaluate_candidate fields.
+    """
+    prompt = CODE_PROMPT.format(spec=spec, module=module)
+    candidates = []
+    for index, (model, response) in enumerate(generate_candidates(prompt, n, models, temperature)):
+        code = None if is_error_response(response) else extract_code(response)
+        candidates.append({"index": index, "model": model, "code": code, "passed": False,
+                           "test_seconds": None, "benchmark_seconds": None,
+                           "output": response if code is None else ""})
+
+    runnable = [c for c in candidates if c["code"] is not None]
+    # Each evaluation is its own subprocess, so threads are enough to keep os.cpu_count() of them busy.
+    with ThreadPoolExecutor(max_workers=test_workers or os.cpu_count() or 4) as executor:
+        results = executor.map(lambda c: evaluate_candidate(
+            c["code"], tests_path, module, benchmark, timeout=timeout,
+            cpu_seconds=cpu_seconds, memory_mb=memory_mb), runnable)
+        for candidate, result in zip(runnable, results):
+            candidate.update(result)
+
+    passing = [c for c in candidates if c["passed"]]
+    if benchmark:
+        passing = [c for c in passing if c["benchmark_seconds"] is not None]
+    key = "benchmark_seconds" if benchmark else "test_seconds"
+    best = min(passing, key=lambda c: c[key]) if passing else None
+    return best, candidates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate N candidate implementations and keep the best passing one.")
+    parser.add_argument("spec", help="Path to a text/markdown file describing the function to write.")
+    parser.add_argument("--tests", required=True, help="Pytest file that imports the candidate module.")
+    parser.add_argument("--module", default="generated_function", help="Module name the tests import.")
+    parser.add_argument("--n", type=int, default=5)
+    parser.add_argument("--models", nargs="+", default=["gpt-4.1-mini"])
+    parser.add_argument("--benchmark", help="Statement to time for passing candidates, e.g. \"slugify('a b' * 100)\".")
+    parser.add_argument("--timeout", type=int, default=30, help="Wall-clock seconds per test run.")
+    parser.add_argument("--output", default=None, help="Artifact path for the winner (default: <module>.py).")
+    args = parser.parse_args()
+
+    with open(args.spec, "r", encoding="utf-8") as f:
+        spec_text = f.read()
+    best, candidates = best_of_n(spec_text, args.tests, module=args.module, n=args.n, models=args.models,
+                                 benchmark=args.benchmark, timeout=args.timeout)
+    for c in candidates:
+        status = "pass" if c["passed"] else ("no code" if c["code"] is None else "fail")
+        print(f"  #{c['index']} {c['model']}: {status} | tests {c['test_seconds']}s | bench {c['benchmark_seconds']}s")
+    if best is None:
+        print("No candidate passed the tests.")
+        sys.exit(1)
+    print(f"Best candidate: #{best['index']} from {best['model']}")
+    save_artifact(best["code"], args.output or f"{args.module}.py")
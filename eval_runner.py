@@ -0,0 +1,199 @@
+# --- Resumable LLM-as-Judge Evaluation Runner ---
+# Description: Scores a JSONL dataset against a rubric with an LLM judge.
+#              Judge (and candidate generation) calls fan out concurrently under
+#              a rate limit per provider, every finished result is appended to a JSONL
+#              checkpoint so reruns skip completed items, and aggregate metrics
+#              are updated incrementally as results arrive.
+#
+# Dataset lines: {"id": ..., "input": ..., "output": ..., "reference": ...}
+#   "output" is optional; when absent each candidate model generates it.
+# Usage: python eval_runner.py data.jsonl --rubric rubric.md --models gpt-4.1-mini gemini-2.5-flash \
+#            --rps 5 --provider-rps openai=50 gemini=20
+# -----------------------------------------------------------------
+
+import argparse
+import json
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils import setup_llm_client, get_completion, clean_llm_output, is_error_response, RateLimiter
+
+JUDGE_PROMPT = """You are an impartial evaluator. Score the response against the rubric.
+
+<rubric>
+{rubric}
+</rubric>
+
+<input>
+{input}
+</input>
+
+<reference>
+{reference}
+</reference>
+
+<response>
+{output}
+</response>
+
+Reply with JSON only: {{"score": <integer 1-5>, "reasoning": "<one or two sentences>"}}"""
+
+
+class RunningStats:
+    """Incremental mean/stddev (Welford) and pass rate for one model."""
+
+    def __init__(self, pass_threshold):
+        self.pass_threshold = pass_threshold
+        self.count = 0
+        self.errors = 0
+        self.passed = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, score):
+        if score is None:
+            self.errors += 1
+            return
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (score - self.mean)
+        self.passed += score >= self.pass_threshold
+
+    def summary(self):
+        return {
+            "scored": self.count,
+            "errors": self.errors,
+            "mean_score": round(self.mean, 3),
+            "stddev": round(math.sqrt(self._m2 / (self.count - 1)), 3) if self.count > 1 else 0.0,
+            "pass_rate": round(self.passed / self.count, 3) if self.count else 0.0,
+        }
+
+
+def load_dataset(path):
+    """Reads a JSONL dataset; items without an 'id' are keyed by line number."""
+    items = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f):
+            if line.strip():
+                item = json.loads(line)
+                item.setdefault("id", line_number)
+                items.append(item)
+    return items
+
+
+def _load_checkpoint(path):
+    """Returns completed results, ignoring a torn final line from a crash."""
+    results = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return results
+
+
+def _drop_torn_line(path):
+    """Truncates a partial final record left by a crash so new records start on their own line."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def _parse_score(judge_response):
+    if is_error_response(judge_response):
+        return None, judge_response
+    try:
+        verdict = json.loads(clean_llm_output(judge_response, language='json'))
+        return int(verdict["score"]), verdict.get("reasoning", "")
+    except (ValueError, KeyError, TypeError):
+        return None, f"Unparseable judge response: {judge_response[:200]}"
+
+
+def run_evaluation(dataset_path, rubric, models, judge_model="gpt-4.1-mini",
+                   checkpoint_path="artifacts/eval_results.jsonl", max_workers=8,
+                   requests_per_second=5.0, pass_threshold=4, provider_rps=None):
+    """
+    Evaluates every (model, item) pair not already scored in the checkpoint and
+    returns aggregate metrics per model, including results from earlier runs.
+    Pairs that errored in an earlier run are retried. Each provider has its own
+    rate limit: provider_rps[provider] if given, else requests_per_second.
+    """
+    items = load_dataset(dataset_path)
+    previous = [r for r in _load_checkpoint(checkpoint_path) if r.get("score") is not None]
+    done = {(r["model"], str(r["id"])) for r in previous}
+    stats = {model: RunningStats(pass_threshold) for model in models}
+    for result in previous:
+        if result["model"] in stats:
+            stats[result["model"]].add(result["score"])
+
+    clients = {name: setup_llm_client(name) for name in set(models) | {judge_model}}
+    # Providers enforce their limits independently, so one provider's budget never throttles another.
+    provider_rps = provider_rps or {}
+    limiters = {provider: RateLimiter(provider_rps.get(provider, requests_per_second))
+                for provider in {api_provider for _, _, api_provider in clients.values()}}
+    write_lock = threading.Lock()
+
+    def complete(model, prompt):
+        client, model_name, api_provider = clients[model]
+        limiters[api_provider].wait()
+        return get_completion(prompt, client, model_name, api_provider, temperature=0.0)
+
+    def evaluate(model, item):
+        output = item.get("output")
+        if output is None:
+            output = complete(model, item["input"])
+            if is_error_response(output):
+                return {"model": model, "id": item["id"], "score": None, "reasoning": output, "output": None}
+        judge_response = complete(judge_model, JUDGE_PROMPT.format(
+            rubric=rubric, input=item.get("input", ""), reference=item.get("reference", "N/A"), output=output))
+        score, reasoning = _parse_score(judge_response)
+        return {"model": model, "id": item["id"], "score": score, "reasoning": reasoning, "output": output}
+
+    pending = [(model, item) for model in models for item in items if (model, str(item["id"])) not in done]
+    print(f"Evaluating {len(pending)} pairs ({len(done)} already in checkpoint).")
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+    _drop_torn_line(checkpoint_path)
+    with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(evaluate, model, item) for model, item in pending]
+        for completed, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            with write_lock:
+                checkpoint.write(json.dumps(result, default=str) + "\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+            stats[result["model"]].add(result["score"])
+            if completed % 50 == 0 or completed == len(futures):
+                print(f"  {completed}/{len(futures)} done | {result['model']}: {stats[result['model']].summary()}")
+
+    return {model: model_stats.summary() for model, model_stats in stats.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a resumable LLM-as-judge evaluation.")
+    parser.add_argument("dataset", help="JSONL dataset path.")
+    parser.add_argument("--rubric", required=True, help="Path to a rubric text/markdown file.")
+    parser.add_argument("--models", nargs="+", required=True, help="Candidate models from RECOMMENDED_MODELS.")
+    parser.add_argument("--judge", default="gpt-4.1-mini")
+    parser.add_argument("--checkpoint", default="artifacts/eval_results.jsonl")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=5.0, help="Max LLM requests per second, per provider.")
+    parser.add_argument("--provider-rps", nargs="+", default=[], metavar="PROVIDER=RPS",
+                        help="Per-provider overrides of --rps, e.g. openai=50 gemini=20.")
+    args = parser.parse_args()
+    overrides = {provider: float(rate) for provider, rate in (item.split("=", 1) for item in args.provider_rps)}
+
+    with open(args.rubric, 'r', encoding='utf-8') as f:
+        rubric_text = f.read()
+    summary = run_evaluation(args.dataset, rubric_text, args.models, judge_model=args.judge,
+                             checkpoint_path=args.checkpoint, max_workers=args.workers,
+                             requests_per_second=args.rps, provider_rps=overrides)
+    print(json.dumps(summary, indent=2))
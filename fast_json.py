@@ -0,0 +1,28 @@
+# --- Fast JSON Serialization for the FastAPI Services ---
+# Description: High-throughput response path. List endpoints select plain row
+#              tuples, validate them with a prebuilt pydantic TypeAdapter and
+#              dump straight to JSON bytes, skipping ORM hydration and FastAPI's
+#              per-object response_model round-trip. Other responses use
+#              orjson when it is installed.
+# -----------------------------------------------------------------
+
+from fastapi.responses import Response
+
+try:
+    import orjson  # noqa: F401  (required by ORJSONResponse)
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultJSONResponse
+
+
+class JSONBytesResponse(Response):
+    """Response for a body that is already serialized JSON."""
+    media_type = "application/json"
+
+
+def serialize_rows(adapter, rows):
+    """
+    Validates rows (SQLAlchemy Row tuples or ORM objects) with a list TypeAdapter
+    and returns them as a ready-to-send JSON response.
+    """
+    return JSONBytesResponse(adapter.dump_json(adapter.validate_python(rows, from_attributes=True)))
@@ -0,0 +1,241 @@
+# --- Async Job Queue for Long-Running Generation Tasks ---
+# Description: Persists jobs in the application's SQLite database and runs them
+#              on a pool of asyncio workers, so clients can enqueue a slow
+#              generation (PRD, architecture doc, test suite) and poll for it
+#              instead of holding an HTTP connection open. Running jobs hold a
+#              lease their worker keeps renewing; only jobs whose lease has
+#              expired (their process died) are requeued, so several worker
+#              processes can share one queue without running a job twice.
+# -----------------------------------------------------------------
+
+import asyncio
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Index, inspect, text, update
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+JobBase = declarative_base()
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class Job(JobBase):
+    __tablename__ = 'jobs'
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False, default='{}')
+    status = Column(String, nullable=False, default=JOB_QUEUED)
+    priority = Column(Integer, nullable=False, default=0)
+    progress = Column(Float, nullable=False, default=0.0)
+    result = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    # Worker process running the job, and when its claim lapses unless renewed.
+    owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    # Workers claim the highest-priority, oldest queued job.
+    __table_args__ = (Index('ix_jobs_status_priority', 'status', 'priority', 'id'),)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": self.progress,
+            "result": json.loads(self.result) if self.result is not None else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with a pool of asyncio workers.
+
+    handlers maps a job kind to a blocking callable
+    handler(payload: dict, report_progress: Callable[[float], None]) -> JSON-serializable
+    which is run in a worker thread so the event loop stays responsive.
+    """
+
+    def __init__(self, engine, handlers, concurrency=2, poll_interval=1.0, lease_seconds=60.0):
+        JobBase.metadata.create_all(bind=engine)
+        _add_missing_columns(engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._workers = []
+        self._loop = None
+        self._wakeup = None
+
+    # --- Client API ---
+
+    def enqueue(self, kind, payload=None, priority=0):
+        """Persists a new job and wakes an idle worker. Returns the job as a dict."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'.")
+        db = self.SessionLocal()
+        try:
+            job = Job(kind=kind, payload=json.dumps(payload or {}), priority=priority)
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            job_dict = job.to_dict()
+        finally:
+            db.close()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return job_dict
+
+    def get(self, job_id):
+        """Returns the job as a dict, or None if it does not exist."""
+        db = self.SessionLocal()
+        try:
+            job = db.get(Job, job_id)
+            return job.to_dict() if job else None
+        finally:
+            db.close()
+
+    # --- Worker Pool ---
+
+    async def start(self):
+        """Requeues jobs whose worker died and starts the worker pool."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._requeue_expired)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._workers.append(asyncio.create_task(self._reaper()))
+
+    async def stop(self):
+        """Cancels the workers and hands the jobs they were running back to the queue."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+        await asyncio.to_thread(self._release_owned)
+
+    def _requeue(self, *conditions):
+        db = self.SessionLocal()
+        try:
+            requeued = db.execute(
+                update(Job)
+                .where(Job.status == JOB_RUNNING, *conditions)
+                .values(status=JOB_QUEUED, progress=0.0, owner=None, lease_expires_at=None)
+            ).rowcount
+            db.commit()
+            return requeued
+        finally:
+            db.close()
+
+    def _requeue_expired(self):
+        """Requeues running jobs whose lease lapsed (or that predate leases); live workers' jobs are left alone."""
+        return self._requeue((Job.lease_expires_at == None) | (Job.lease_expires_at < datetime.utcnow()))  # noqa: E711
+
+    def _release_owned(self):
+        return self._requeue(Job.owner == self.owner)
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            if await asyncio.to_thread(self._requeue_expired):
+                self._wakeup.set()
+
+    def _lease_deadline(self):
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def _claim(self):
+        """Atomically moves the next queued job to running; safe across processes."""
+        db = self.SessionLocal()
+        try:
+            while True:
+                job = (db.query(Job)
+                       .filter(Job.status == JOB_QUEUED)
+                       .order_by(Job.priority.desc(), Job.id)
+                       .first())
+                if job is None:
+                    return None
+                claimed = db.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == JOB_QUEUED)
+                    .values(status=JOB_RUNNING, started_at=datetime.utcnow(), owner=self.owner,
+                            lease_expires_at=self._lease_deadline())
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    return job.id, job.kind, json.loads(job.payload)
+                # Another worker won the race; try the next job.
+        finally:
+            db.close()
+
+    def _update(self, job_id, **values):
+        """Updates a job this worker still owns; returns False if its lease was lost to another worker."""
+        db = self.SessionLocal()
+        try:
+            updated = db.execute(
+                update(Job).where(Job.id == job_id, Job.owner == self.owner, Job.status == JOB_RUNNING)
+                .values(**values)
+            ).rowcount
+            db.commit()
+            return updated == 1
+        finally:
+            db.close()
+
+    async def _heartbeat(self, job_id):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await asyncio.to_thread(self._update, job_id, lease_expires_at=self._lease_deadline())
+
+    async def _worker(self):
+        while True:
+            claimed = await asyncio.to_thread(self._claim)
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job_id, kind, payload = claimed
+
+            def report_progress(fraction, job_id=job_id):
+                self._update(job_id, progress=max(0.0, min(1.0, float(fraction))),
+                             lease_expires_at=self._lease_deadline())
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                result = await asyncio.to_thread(self.handlers[kind], payload, report_progress)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await asyncio.to_thread(self._update, job_id, status=JOB_FAILED,
+                                        error=str(e), finished_at=datetime.utcnow())
+            else:
+                await asyncio.to_thread(self._update, job_id, status=JOB_SUCCEEDED, progress=1.0,
+                                        result=json.dumps(result), finished_at=datetime.utcnow())
+            finally:
+                heartbeat.cancel()
+
+
+def _add_missing_columns(engine):
+    """Adds columns introduced after a jobs table was first created (SQLite has no create_all migration)."""
+    existing = {column["name"] for column in inspect(engine).get_columns(Job.__tablename__)}
+    with engine.begin() as conn:
+        for column in Job.__table__.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {Job.__tablename__} ADD COLUMN {column.name} {column_type}"))
@@ -0,0 +1,249 @@
+# --- Mock LLM Provider Server for Offline Performance Testing ---
+# Description: Local stand-in for the OpenAI chat-completions and Anthropic
+#              messages APIs, streaming included. Latency, tokens/sec and 429
+#              injection are configurable and seeded, and responses are either
+#              canned or record-replayed from a cassette, so the whole stack can
+#              be benchmarked deterministically with no network.
+#
+# Usage: python mock_llm_server.py --port 9000 --latency-ms 400 --tokens-per-sec 80 --error-rate 0.02
+#        LLM_MOCK_BASE_URL=http://127.0.0.1:9000 python your_pipeline.py
+#        (setup_llm_client then points OpenAI, Anthropic and Hugging Face clients at this server)
+# Record/replay: --mode record --cassette artifacts/llm_cassette.jsonl proxies to the real
+#        APIs once (using this server's OPENAI_API_KEY / ANTHROPIC_API_KEY) and saves
+#        responses; --mode replay serves them back.
+# -----------------------------------------------------------------
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_CONFIG = {
+    "mode": os.getenv("MOCK_LLM_MODE", "canned"),            # canned | replay | record
+    "cassette": os.getenv("MOCK_LLM_CASSETTE", "artifacts/llm_cassette.jsonl"),
+    "latency_ms": float(os.getenv("MOCK_LLM_LATENCY_MS", "300")),      # median time to first token
+    "latency_sigma": float(os.getenv("MOCK_LLM_LATENCY_SIGMA", "0.5")),  # lognormal spread
+    "tokens_per_sec": float(os.getenv("MOCK_LLM_TOKENS_PER_SEC", "80")),
+    "response_tokens": int(os.getenv("MOCK_LLM_RESPONSE_TOKENS", "150")),
+    "error_rate": float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),         # fraction of requests answered 429
+    "seed": int(os.getenv("MOCK_LLM_SEED", "42")),
+}
+UPSTREAMS = {"openai": "https://api.openai.com", "anthropic": "https://api.anthropic.com"}
+
+app = FastAPI()
+_rng = random.Random(MOCK_CONFIG["seed"])
+_rng_lock = threading.Lock()
+_cassette = {}
+_cassette_lock = threading.Lock()
+
+
+# --- Simulation ---
+
+def _sample_delay():
+    """Returns (time to first token, seconds per token, whether to answer 429) for one request."""
+    with _rng_lock:
+        ttft = MOCK_CONFIG["latency_ms"] / 1000 * _rng.lognormvariate(0, MOCK_CONFIG["latency_sigma"])
+        throttled = _rng.random() < MOCK_CONFIG["error_rate"]
+    return ttft, 1 / MOCK_CONFIG["tokens_per_sec"], throttled
+
+
+def _request_key(provider, body):
+    relevant = {"provider": provider, "model": body.get("model"), "system": body.get("system"),
+                "messages": body.get("messages")}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _canned_text(body):
+    last = body.get("messages", [{}])[-1].get("content", "")
+    if isinstance(last, list):
+        last = " ".join(part.get("text", "") for part in last if isinstance(part, dict))
+    words = ["mock"] * max(0, MOCK_CONFIG["response_tokens"] - 6)
+    return f"Mock response to: {str(last)[:40]!r} " + " ".join(words)
+
+
+def _load_cassette():
+    path = MOCK_CONFIG["cassette"]
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    _cassette[entry["key"]] = entry["text"]
+
+
+async def _response_text(provider, body, headers):
+    """Returns the completion text according to the configured mode."""
+    if MOCK_CONFIG["mode"] == "canned":
+        return _canned_text(body)
+    key = _request_key(provider, body)
+    if key in _cassette:
+        return _cassette[key]
+    if MOCK_CONFIG["mode"] == "replay":
+        return _canned_text(body)
+    text = await _record(provider, body, headers)
+    with _cassette_lock:
+        _cassette[key] = text
+        os.makedirs(os.path.dirname(os.path.abspath(MOCK_CONFIG["cassette"])), exist_ok=True)
+        with open(MOCK_CONFIG["cassette"], "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "text": text}) + "\n")
+    return text
+
+
+def _upstream_headers(provider, headers):
+    """
+    Builds headers for the real provider. Clients pointed at the mock send a
+    placeholder key, so credentials come from this server's own environment.
+    """
+    forwarded = {name: value for name, value in headers.items() if name in ("anthropic-version", "content-type")}
+    if provider == "openai":
+        forwarded["authorization"] = f"Bearer {os.getenv('OPENAI_API_KEY', '')}"
+    else:
+        forwarded["x-api-key"] = os.getenv("ANTHROPIC_API_KEY", "")
+        forwarded.setdefault("anthropic-version", "2023-06-01")
+    return forwarded
+
+
+async def _record(provider, body, headers):
+    """Proxies a non-streaming request to the real provider and returns its text."""
+    import httpx
+    forwarded = _upstream_headers(provider, headers)
+    upstream_body = {**body, "stream": False}
+    path = "/v1/chat/completions" if provider == "openai" else "/v1/messages"
+    async with httpx.AsyncClient(timeout=300) as client:
+        response = await client.post(UPSTREAMS[provider] + path, json=upstream_body, headers=forwarded)
+        response.raise_for_status()
+        data = response.json()
+    if provider == "openai":
+        return data["choices"][0]["message"]["content"]
+    return "".join(block.get("text", "") for block in data["content"])
+
+
+def _tokens(text):
+    """Splits text into word-sized pieces that concatenate back to the original."""
+    words = text.split(" ")
+    return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+
+def _rate_limited(provider):
+    if provider == "openai":
+        body = {"error": {"message": "Rate limit reached (mock).", "type": "rate_limit_error", "code": "rate_limit_exceeded"}}
+    else:
+        body = {"type": "error", "error": {"type": "rate_limit_error", "message": "Rate limit reached (mock)."}}
+    return JSONResponse(body, status_code=429, headers={"retry-after": "1"})
+
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+# --- OpenAI Chat Completions ---
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    body = await request.json()
+    ttft, per_token, throttled = _sample_delay()
+    if throttled:
+        return _rate_limited("openai")
+    text = await _response_text("openai", body, request.headers)
+    tokens = _tokens(text)
+    completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = body.get("model", "mock")
+    usage = {"prompt_tokens": len(json.dumps(body.get("messages", []))) // 4,
+             "completion_tokens": len(tokens)}
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+    if not body.get("stream"):
+        await asyncio.sleep(ttft + per_token * len(tokens))
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    async def stream():
+        await asyncio.sleep(ttft)
+        chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+        yield "data: " + json.dumps({**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}) + "\n\n"
+        for token in tokens:
+            await asyncio.sleep(per_token)
+            yield "data: " + json.dumps({**chunk, "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}) + "\n\n"
+        yield "data: " + json.dumps({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}) + "\n\n"
+        yield "data: [DONE]\n\n"
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+# --- Anthropic Messages ---
+
+@app.post("/v1/messages")
+async def anthropic_messages(request: Request):
+    body = await request.json()
+    ttft, per_token, throttled = _sample_delay()
+    if throttled:
+        return _rate_limited("anthropic")
+    text = await _response_text("anthropic", body, request.headers)
+    tokens = _tokens(text)
+    message_id = f"msg_mock_{uuid.uuid4().hex[:12]}"
+    model = body.get("model", "mock")
+    input_tokens = len(json.dumps(body.get("messages", []))) // 4
+
+    if not body.get("stream"):
+        await asyncio.sleep(ttft + per_token * len(tokens))
+        return {
+            "id": message_id, "type": "message", "role": "assistant", "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": len(tokens)},
+        }
+
+    async def stream():
+        await asyncio.sleep(ttft)
+        yield _sse({"type": "message_start", "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": 0}}}, "message_start")
+        yield _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}, "content_block_start")
+        for token in tokens:
+            await asyncio.sleep(per_token)
+            yield _sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}, "content_block_delta")
+        yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+        yield _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": len(tokens)}}, "message_delta")
+        yield _sse({"type": "message_stop"}, "message_stop")
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.on_event("startup")
+def load_cassette():
+    if MOCK_CONFIG["mode"] in ("replay", "record"):
+        _load_cassette()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local mock of the OpenAI and Anthropic APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--mode", choices=["canned", "replay", "record"], default=MOCK_CONFIG["mode"])
+    parser.add_argument("--cassette", default=MOCK_CONFIG["cassette"])
+    parser.add_argument("--latency-ms", type=float, default=MOCK_CONFIG["latency_ms"])
+    parser.add_argument("--latency-sigma", type=float, default=MOCK_CONFIG["latency_sigma"])
+    parser.add_argument("--tokens-per-sec", type=float, default=MOCK_CONFIG["tokens_per_sec"])
+    parser.add_argument("--response-tokens", type=int, default=MOCK_CONFIG["response_tokens"])
+    parser.add_argument("--error-rate", type=float, default=MOCK_CONFIG["error_rate"])
+    parser.add_argument("--seed", type=int, default=MOCK_CONFIG["seed"])
+    args = parser.parse_args()
+
+    MOCK_CONFIG.update({key: value for key, value in vars(args).items() if key in MOCK_CONFIG})
+    _rng.seed(MOCK_CONFIG["seed"])
+    uvicorn.run(app, host=args.host, port=args.port)
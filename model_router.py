@@ -0,0 +1,228 @@
+# --- Model Router for AI-Driven Software Engineering Course ---
+# Description: Picks a model per request from RECOMMENDED_MODELS using live
+#              measurements (rolling latency, error rate, tokens/sec) and
+#              declared capabilities, with ordered fallback and hedged requests.
+# -----------------------------------------------------------------
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils import (RECOMMENDED_MODELS, setup_llm_client, get_completion, is_error_response, fits_context,
+                   estimate_tokens, CONTEXT_WINDOW_ERROR_PREFIX)
+
+# --- Cost Configuration ---
+# Approximate list price in USD per 1M output tokens; used only for relative ranking.
+MODEL_COSTS = {
+    "gpt-4o": 10.0,
+    "gpt-4.1": 8.0,
+    "gpt-4.1-mini": 1.6,
+    "gpt-4.1-nano": 0.4,
+    "gpt-4.5": 150.0,
+    "o3": 8.0,
+    "o4-mini": 4.4,
+    "codex-mini-latest": 6.0,
+    "gemini-2.5-pro": 10.0,
+    "gemini-2.5-flash": 2.5,
+    "gemini-2.5-flash-lite": 0.4,
+    "claude-opus-4-20250514": 75.0,
+    "claude-sonnet-4-20250514": 15.0,
+    "claude-3-7-sonnet-20250219": 15.0,
+    "claude-3-5-haiku-20241022": 4.0,
+}
+DEFAULT_COST = 5.0
+
+# --- Live Measurements ---
+
+class ModelStats:
+    """Rolling latency, error-rate and tokens/sec measurements for one model."""
+
+    def __init__(self, window=50):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.tokens_per_sec = deque(maxlen=window)
+        self.last_failure = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok, tokens=0):
+        """Records one call; only successful calls contribute latency and throughput."""
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(latency)
+                if latency > 0 and tokens:
+                    self.tokens_per_sec.append(tokens / latency)
+            else:
+                self.last_failure = time.monotonic()
+
+    def percentile(self, p):
+        """Returns the p-th latency percentile in seconds, or None if unmeasured."""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, round(p / 100 * len(samples)) - 1))
+        return samples[index]
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def throughput(self):
+        with self._lock:
+            if not self.tokens_per_sec:
+                return None
+            return sum(self.tokens_per_sec) / len(self.tokens_per_sec)
+
+    @property
+    def samples(self):
+        return len(self.outcomes)
+
+
+# --- Routing Policies ---
+# Each policy maps (model_name, stats) to a sort key; lower keys are preferred.
+# Unmeasured models sort after measured ones so live data wins, but they stay
+# in the fallback order.
+
+def _fastest(model_name, stats):
+    p50 = stats.percentile(50)
+    return (p50 is None, p50 or 0.0)
+
+def _cheapest(model_name, stats):
+    return (MODEL_COSTS.get(model_name, DEFAULT_COST), stats.percentile(50) or 0.0)
+
+def _highest_throughput(model_name, stats):
+    tps = stats.throughput
+    return (tps is None, -(tps or 0.0))
+
+POLICIES = {
+    "fastest": _fastest,
+    "cheapest": _cheapest,
+    "throughput": _highest_throughput,
+}
+
+
+class ModelRouter:
+    """
+    Routes completions across RECOMMENDED_MODELS.
+
+    Example: "cheapest under 2 s p95 with vision" is
+        router.complete(prompt, policy="cheapest", vision=True, max_p95=2.0)
+    """
+
+    def __init__(self, models=None, window=50, max_error_rate=0.5, cooldown=30.0):
+        self.models = dict(models or RECOMMENDED_MODELS)
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.stats = {name: ModelStats(window) for name in self.models}
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def candidates(self, vision=None, provider=None):
+        """Returns model names matching the declared capabilities."""
+        names = []
+        for name, config in self.models.items():
+            if vision and not config.get("vision"):
+                continue
+            if provider and config.get("provider") != provider:
+                continue
+            names.append(name)
+        return names
+
+    def _healthy(self, name):
+        stats = self.stats[name]
+        if time.monotonic() - stats.last_failure < self.cooldown and stats.last_failure:
+            return False
+        return stats.samples < 5 or stats.error_rate <= self.max_error_rate
+
+    def rank(self, policy="fastest", vision=None, provider=None, max_p95=None):
+        """
+        Returns candidate models in preference order. Models breaching max_p95
+        (seconds) or recently failing are demoted to the end, not dropped, so
+        they still serve as a last-resort fallback.
+        """
+        key = POLICIES[policy] if isinstance(policy, str) else policy
+        preferred, demoted = [], []
+        for name in self.candidates(vision=vision, provider=provider):
+            p95 = self.stats[name].percentile(95)
+            within_budget = max_p95 is None or p95 is None or p95 <= max_p95
+            (preferred if within_budget and self._healthy(name) else demoted).append(name)
+        preferred.sort(key=lambda name: key(name, self.stats[name]))
+        demoted.sort(key=lambda name: (self.stats[name].error_rate, key(name, self.stats[name])))
+        return preferred + demoted
+
+    def _client_for(self, name):
+        with self._clients_lock:
+            if name not in self._clients:
+                self._clients[name] = setup_llm_client(name)
+            return self._clients[name]
+
+    def _call(self, name, prompt, temperature):
+        """Runs one completion against a model and records the measurement."""
+        client, model_name, api_provider = self._client_for(name)
+        start = time.monotonic()
+        response = get_completion(prompt, client, model_name, api_provider, temperature=temperature)
+        ok = not is_error_response(response)
+        # Rough token estimate (~4 characters per token) for throughput tracking.
+        self.stats[name].record(time.monotonic() - start, ok, tokens=len(response) // 4 if ok else 0)
+        return response
+
+    def complete(self, prompt, policy="fastest", vision=None, provider=None, max_p95=None,
+                 max_attempts=3, hedge_percentile=95, temperature=0.7):
+        """
+        Gets a completion from the best-ranked model, falling back in order on
+        failure. If a model is still running past its hedge_percentile latency,
+        the next model is fired in parallel and the first success wins.
+        Returns (response, model_name); on total failure the last error string
+        is returned with the model that produced it.
+        """
+        ranked = self.rank(policy, vision=vision, provider=provider, max_p95=max_p95)
+        if not ranked:
+            return "Error: No model matches the requested capabilities.", None
+        # get_completion rejects oversized prompts locally; skip those models rather than
+        # count the rejection as a provider failure and put a healthy model into cooldown.
+        order = [name for name in ranked if fits_context(prompt, name)][:max_attempts]
+        if not order:
+            return (f"{CONTEXT_WINDOW_ERROR_PREFIX}{estimate_tokens(prompt, ranked[0])} tokens does not fit the "
+                    f"context window of any candidate model.", None)
+
+        executor = ThreadPoolExecutor(max_workers=len(order))
+        pending = {}
+        last_error = (None, None)
+        next_index = 0
+        try:
+            while True:
+                if not pending and next_index < len(order):
+                    name = order[next_index]
+                    pending[executor.submit(self._call, name, prompt, temperature)] = name
+                    next_index += 1
+                if not pending:
+                    return last_error
+                hedge_delay = None
+                if hedge_percentile and next_index < len(order):
+                    hedge_delay = self.stats[order[next_index - 1]].percentile(hedge_percentile)
+                done, _ = wait(pending, timeout=hedge_delay, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Hedge: the running call is slower than usual, race the next model.
+                    name = order[next_index]
+                    pending[executor.submit(self._call, name, prompt, temperature)] = name
+                    next_index += 1
+                    continue
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        self.stats[name].record(0.0, False)
+                        response = f"An API error occurred: {e}"
+                    if not is_error_response(response):
+                        return response, name
+                    last_error = (response, name)
+        finally:
+            # Losing hedged calls finish in the background and still update stats.
+            executor.shutdown(wait=False)
@@ -0,0 +1,150 @@
+# --- Parallel Plan Executor for Plan-and-Execute Agent Workflows ---
+# Description: Runs a plan expressed as a dependency graph. Independent steps
+#              (e.g. "research flights" and "research hotels") run concurrently
+#              under a concurrency cap, each step starts as soon as its
+#              dependencies finish, and completed steps are checkpointed so a
+#              failed run resumes without redoing finished work. End-to-end
+#              latency is bounded by the critical path, not the sum of steps.
+#
+# Usage (in a notebook, where an event loop is already running):
+#     results = await run_plan({
+#         "flights": {"fn": research_flights},
+#         "hotels":  {"fn": research_hotels},
+#         "itinerary": {"fn": build_itinerary, "depends_on": ["flights", "hotels"]},
+#     }, max_concurrency=4, checkpoint_path="artifacts/trip_plan.json")
+# From a script, use execute_plan(...) with the same arguments.
+# -----------------------------------------------------------------
+
+import asyncio
+import inspect
+import json
+import os
+
+from utils import atomic_write
+
+
+class PlanExecutionError(Exception):
+    """Raised when a step fails; completed steps remain in the checkpoint."""
+
+    def __init__(self, step_id, error, results):
+        super().__init__(f"Plan step '{step_id}' failed: {error}")
+        self.step_id = step_id
+        self.error = error
+        self.results = results
+
+
+def _validate(steps):
+    """Checks that dependencies exist and the graph is acyclic (Kahn's algorithm)."""
+    for step_id, step in steps.items():
+        for dep in step.get("depends_on", []):
+            if dep not in steps:
+                raise ValueError(f"Step '{step_id}' depends on unknown step '{dep}'.")
+    remaining = {step_id: len(step.get("depends_on", [])) for step_id, step in steps.items()}
+    ready = [step_id for step_id, count in remaining.items() if count == 0]
+    visited = 0
+    while ready:
+        current = ready.pop()
+        visited += 1
+        for step_id, step in steps.items():
+            if current in step.get("depends_on", []):
+                remaining[step_id] -= 1
+                if remaining[step_id] == 0:
+                    ready.append(step_id)
+    if visited != len(steps):
+        raise ValueError("Plan contains a dependency cycle.")
+
+
+def _load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def _save_checkpoint(path, results):
+    """Writes the checkpoint atomically without blocking the event loop."""
+    # Serialized on the loop, so steps finishing meanwhile cannot change what is written.
+    data = json.dumps(results, indent=2).encode('utf-8')
+    await asyncio.to_thread(atomic_write, path, data)
+
+
+async def _call(fn, inputs):
+    """Awaits async step functions; runs blocking ones (e.g. get_completion) in a thread."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(inputs)
+    return await asyncio.to_thread(fn, inputs)
+
+
+async def run_plan(steps, max_concurrency=4, checkpoint_path=None):
+    """
+    Executes a plan and returns {step_id: result}.
+
+    steps maps a step id to {"fn": callable, "depends_on": [step ids]}. Each fn
+    receives a dict of its dependencies' results. When checkpoint_path is set,
+    a step whose result is not JSON-serializable fails the plan; steps already
+    in the checkpoint are not run again.
+    """
+    _validate(steps)
+    results = {step_id: result for step_id, result in _load_checkpoint(checkpoint_path).items() if step_id in steps}
+    semaphore = asyncio.Semaphore(max_concurrency)
+    running = {}
+    failure = None
+
+    async def run_step(step_id):
+        step = steps[step_id]
+        inputs = {dep: results[dep] for dep in step.get("depends_on", [])}
+        async with semaphore:
+            return await _call(step["fn"], inputs)
+
+    def start_ready_steps():
+        for step_id, step in steps.items():
+            if step_id in results or step_id in running.values():
+                continue
+            if all(dep in results for dep in step.get("depends_on", [])):
+                running[asyncio.create_task(run_step(step_id))] = step_id
+
+    start_ready_steps()
+    while running:
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            step_id = running.pop(task)
+            try:
+                result = task.result()
+                if checkpoint_path:
+                    # Results must round-trip unchanged, or dependents would see a different type after a resume.
+                    json.dumps(result)
+            except Exception as e:
+                failure = failure or (step_id, e)
+                continue
+            results[step_id] = result
+            if checkpoint_path:
+                await _save_checkpoint(checkpoint_path, results)
+        # After a failure, let in-flight steps finish (and checkpoint) but start nothing new.
+        if failure is None:
+            start_ready_steps()
+
+    if failure is not None:
+        raise PlanExecutionError(failure[0], failure[1], results)
+    return results
+
+
+def execute_plan(steps, max_concurrency=4, checkpoint_path=None):
+    """Synchronous wrapper around run_plan for scripts (not for running event loops)."""
+    return asyncio.run(run_plan(steps, max_concurrency=max_concurrency, checkpoint_path=checkpoint_path))
+
+
+def llm_step(prompt_template, client, model_name, api_provider):
+    """
+    Builds a step that formats prompt_template with its dependencies' results
+    (e.g. "Plan a day using {flights} and {hotels}") and calls get_completion.
+    An error response raises, so the step is not checkpointed and a resumed
+    run retries it.
+    """
+    import utils
+
+    def step(inputs):
+        response = utils.get_completion(prompt_template.format(**inputs), client, model_name, api_provider)
+        if utils.is_error_response(response):
+            raise RuntimeError(response)
+        return response
+    return step
@@ -0,0 +1,315 @@
+# --- On-Demand Per-Request Profiling for the FastAPI Services ---
+# Description: Opt-in middleware that profiles individual requests, chosen by
+#              an authorized X-Profile-Token header / profile_token query
+#              parameter or by sampling every Nth request. A sampling profiler
+#              records the stacks of the event-loop thread and of the
+#              threadpool threads the request's sync code runs on (registered
+#              by a hook on anyio.to_thread.run_sync while they run it),
+#              attributes time to SQLite, ORM, serialization, upstream
+#              (LLM/HTTP) calls, framework and app code, and pairs it with
+#              exact SQL timings.
+#              Profiles are kept in memory and served from /admin/profiles.
+#              Without PROFILE_TOKEN nothing is installed, so overhead is zero.
+#
+# Usage: install_profiler(app, engine)
+#        curl -H "X-Profile-Token: $PROFILE_TOKEN" localhost:8000/users   (response has X-Profile-Id)
+#        curl -H "X-Profile-Token: $PROFILE_TOKEN" localhost:8000/admin/profiles/<id>
+# Configuration (environment): PROFILE_TOKEN, PROFILE_SAMPLE_EVERY (0 = only on
+#              demand), PROFILE_INTERVAL_MS, PROFILE_KEEP.
+# -----------------------------------------------------------------
+
+import contextvars
+import functools
+import hmac
+import itertools
+import os
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+
+TOKEN_HEADER = b"x-profile-token"
+TOKEN_QUERY_PARAM = "profile_token"
+MAX_STACK_DEPTH = 128
+
+# Checked innermost frame first; the first matching marker decides where a sample's time went.
+CATEGORIES = (
+    ("await", ("/selectors.py",)),
+    ("sqlite", ("/sqlite3/", "/sqlalchemy/engine/", "/sqlalchemy/pool/", "/sqlalchemy/dialects/")),
+    ("orm", ("/sqlalchemy/",)),
+    ("serialization", ("/pydantic/", "/pydantic_core/", "/fastapi/encoders.py", "/json/", "/orjson", "/fast_json.py")),
+    ("upstream", ("/httpx/", "/httpcore/", "/openai/", "/anthropic/", "/requests/", "/urllib3/",
+                  "/google/", "/huggingface_hub/", "/ssl.py", "/socket.py")),
+    ("framework", ("/starlette/", "/fastapi/", "/anyio/", "/uvicorn/", "/asyncio/", "/concurrent/",
+                   "/request_profiler.py", "/api_metrics.py", "/admission_control.py")),
+)
+_STDLIB = sysconfig.get_paths()["stdlib"].replace("\\", "/")
+
+# The RequestProfile of the current request, if it is being profiled.
+_current_profile = contextvars.ContextVar("current_profile", default=None)
+
+
+def _categorize(filenames):
+    """Maps a sample's frame filenames (innermost first) to a time category."""
+    for filename in filenames:
+        for category, markers in CATEGORIES:
+            if any(marker in filename for marker in markers):
+                return category
+        if "site-packages" not in filename and not filename.startswith(_STDLIB):
+            return "app"
+    return "other"
+
+
+class RequestProfile:
+    """Samples the threads serving one request until stopped."""
+
+    def __init__(self, method, path, interval):
+        self.id = uuid.uuid4().hex[:12]
+        self.method, self.path, self.interval = method, path, interval
+        self.started_at = time.time()
+        # Thread id -> number of this request's calls running on it; the event-loop thread is always sampled.
+        self.threads = Counter({threading.get_ident(): 1})
+        self._threads_lock = threading.Lock()
+        self.stacks = Counter()
+        self.categories = Counter()
+        self.samples = 0
+        self.queries = []
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{self.id}", daemon=True)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self.duration = time.perf_counter() - self._start
+
+    def track(self, func):
+        """Wraps func so the thread running it is sampled for this request until it returns."""
+
+        @functools.wraps(func)
+        def tracked(*args, **kwargs):
+            thread_id = threading.get_ident()
+            with self._threads_lock:
+                self.threads[thread_id] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._threads_lock:
+                    self.threads[thread_id] -= 1
+                    if not self.threads[thread_id]:
+                        del self.threads[thread_id]
+        return tracked
+
+    def _sample(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            # A CPU-bound thread holding the GIL delays this thread well past the interval,
+            # so each sample is weighted by the time that actually elapsed since the last one.
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frames = sys._current_frames()
+            with self._threads_lock:
+                thread_ids = list(self.threads)
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                names, filenames = [], []
+                while frame is not None and len(names) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    filename = code.co_filename.replace("\\", "/")
+                    names.append(f"{code.co_name} ({filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    filenames.append(filename)
+                    frame = frame.f_back
+                self.samples += 1
+                self.stacks[";".join(reversed(names))] += 1
+                self.categories[_categorize(filenames)] += elapsed
+
+    def record_query(self, statement, seconds):
+        self.queries.append((statement, seconds))
+
+    def report(self, route, status, top_stacks=50, top_queries=20):
+        """Returns the profile as a JSON-serializable dict."""
+        sample_ms = self.interval * 1000
+        db_seconds = sum(seconds for _, seconds in self.queries)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "interval_ms": sample_ms,
+            "samples": self.samples,
+            # Sampled time per category; threads are summed, so concurrent work can exceed duration_ms.
+            "breakdown_ms": {category: round(seconds * 1000, 3) for category, seconds in self.categories.most_common()},
+            "db": {
+                "queries": len(self.queries),
+                "total_ms": round(db_seconds * 1000, 3),
+                "slowest": [{"statement": statement, "ms": round(seconds * 1000, 3)}
+                            for statement, seconds in sorted(self.queries, key=lambda q: -q[1])[:top_queries]],
+            },
+            # Folded stacks (outermost first), ready for flamegraph.pl or speedscope.
+            "stacks": [{"stack": stack, "samples": count} for stack, count in self.stacks.most_common(top_stacks)],
+        }
+
+
+class ProfileStore:
+    """Keeps the most recent profiles in memory."""
+
+    def __init__(self, keep=50):
+        self._profiles = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def add(self, report):
+        with self._lock:
+            self._profiles.append(report)
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+    def summaries(self):
+        with self._lock:
+            profiles = list(self._profiles)
+        keys = ("id", "method", "path", "route", "status", "started_at", "duration_ms", "breakdown_ms")
+        return [{key: profile[key] for key in keys} for profile in reversed(profiles)]
+
+
+def instrument_engine(engine):
+    """Attaches cursor listeners that time every query issued by a profiled request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        if profile is not None and conn.info.get("profile_query_start"):
+            profile.record_query(statement, time.perf_counter() - conn.info["profile_query_start"].pop())
+
+
+def instrument_threadpool():
+    """
+    Wraps anyio.to_thread.run_sync, which Starlette and FastAPI use for sync
+    endpoints, dependencies and response validation, so a worker thread is
+    sampled exactly while it runs a profiled request's code. Calls made
+    outside a profiled request pass straight through.
+    """
+    import anyio.to_thread
+
+    original = anyio.to_thread.run_sync
+    if getattr(original, "_profiler_hook", False):
+        return
+
+    @functools.wraps(original)
+    async def run_sync(func, *args, **kwargs):
+        profile = _current_profile.get()
+        if profile is not None:
+            func = profile.track(func)
+        return await original(func, *args, **kwargs)
+
+    run_sync._profiler_hook = True
+    anyio.to_thread.run_sync = run_sync
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware; requests that are not selected pass straight through."""
+
+    def __init__(self, app, token, store, sample_every=0, interval=0.001, exempt_prefix="/admin/profiles"):
+        self.app = app
+        self.exempt_prefix = exempt_prefix
+        self.token = token.encode("utf-8")
+        self.store = store
+        self.sample_every = sample_every
+        self.interval = interval
+        self._counter = itertools.count(1)
+
+    def _selected(self, scope):
+        if scope["path"].startswith(self.exempt_prefix):
+            return False
+        for name, value in scope["headers"]:
+            if name == TOKEN_HEADER:
+                return hmac.compare_digest(value, self.token)
+        query = scope.get("query_string", b"")
+        if TOKEN_QUERY_PARAM.encode("ascii") in query:
+            values = parse_qs(query.decode("latin-1")).get(TOKEN_QUERY_PARAM, [""])
+            return hmac.compare_digest(values[0].encode("utf-8"), self.token)
+        return bool(self.sample_every) and next(self._counter) % self.sample_every == 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], self.interval)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile.id.encode("ascii"))]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.stop()
+            _current_profile.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.store.add(profile.report(route, status[0]))
+
+
+def install_profiler(app, engine=None, token=None, sample_every=None, interval_ms=None, keep=None,
+                     path="/admin/profiles"):
+    """
+    Adds the profiling middleware, threadpool hook, SQL listeners and admin
+    endpoints to a FastAPI app. Does nothing unless a token is given or
+    PROFILE_TOKEN is set. Returns the ProfileStore, or None when disabled.
+    """
+    token = token or os.getenv("PROFILE_TOKEN")
+    if not token:
+        return None
+    sample_every = sample_every if sample_every is not None else int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+    interval_ms = interval_ms or float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+    store = ProfileStore(keep or int(os.getenv("PROFILE_KEEP", "50")))
+
+    app.add_middleware(ProfilingMiddleware, token=token, store=store, sample_every=sample_every,
+                       interval=interval_ms / 1000, exempt_prefix=path)
+    instrument_threadpool()
+    if engine is not None:
+        instrument_engine(engine)
+
+    def authorize(request):
+        supplied = request.headers.get("x-profile-token", "")
+        if not hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8")):
+            raise HTTPException(status_code=403, detail="Invalid profile token")
+
+    @app.get(path, include_in_schema=False)
+    def list_profiles(request: Request):
+        authorize(request)
+        return store.summaries()
+
+    @app.get(path + "/{profile_id}", include_in_schema=False)
+    def get_profile(profile_id: str, request: Request):
+        authorize(request)
+        profile = store.get(profile_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return profile
+
+    return store
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the top-level modules (utils, model_router, job_queue, ...) importable from the tests.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from admission_control import AdmissionControlMiddleware, MemoryTokenBucketStore, SQLiteTokenBucketStore
+
+
+def _app(**options):
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items():
+        return {"ok": True}
+
+    @app.post("/slow")
+    async def slow():
+        await asyncio.sleep(0.3)
+        return {"ok": True}
+
+    app.add_middleware(AdmissionControlMiddleware, **options)
+    return app
+
+
+class TestRateLimit:
+
+    def test_429_with_retry_after_once_burst_is_spent(self):
+        client = TestClient(_app(rate=0.5, burst=2, store=MemoryTokenBucketStore()))
+        assert client.get("/items").status_code == 200
+        assert client.get("/items").status_code == 200
+        response = client.get("/items")
+        assert response.status_code == 429
+        assert response.json() == {"detail": "Rate limit exceeded"}
+        assert response.headers["retry-after"] == "2"
+
+    def test_buckets_are_per_api_key(self):
+        client = TestClient(_app(rate=0.5, burst=1, store=MemoryTokenBucketStore()))
+        assert client.get("/items", headers={"x-api-key": "a"}).status_code == 200
+        assert client.get("/items", headers={"x-api-key": "a"}).status_code == 429
+        assert client.get("/items", headers={"x-api-key": "b"}).status_code == 200
+
+    def test_sqlite_store_is_shared(self, tmp_path):
+        path = str(tmp_path / "buckets.db")
+        assert SQLiteTokenBucketStore(path).take("ip:1", 1.0, 1) == 0.0
+        assert SQLiteTokenBucketStore(path).take("ip:1", 1.0, 1) > 0.0
+
+    def test_cors_preflight_is_exempt_and_rejections_keep_cors_headers(self):
+        app = _app(rate=0.5, burst=1, store=MemoryTokenBucketStore())
+        app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000"], allow_methods=["*"],
+                           expose_headers=["Retry-After"])
+        client = TestClient(app)
+        origin = {"Origin": "http://localhost:3000"}
+        for _ in range(3):
+            preflight = client.options("/items", headers={**origin, "Access-Control-Request-Method": "GET"})
+            assert preflight.status_code == 200
+        assert client.get("/items", headers=origin).status_code == 200
+        rejected = client.get("/items", headers=origin)
+        assert rejected.status_code == 429
+        assert rejected.headers["access-control-allow-origin"] == "http://localhost:3000"
+        assert "Retry-After" in rejected.headers["access-control-expose-headers"]
+
+
+class TestLoadShedding:
+
+    def test_503_when_route_class_is_saturated(self):
+        route_classes = {
+            "read": {"max_concurrency": 8, "max_queue_wait": 0.5},
+            "write": {"max_concurrency": 1, "max_queue_wait": 0.05},
+            "llm": {"max_concurrency": 1, "max_queue_wait": 0.05},
+        }
+        app = _app(rate=100, burst=100, store=MemoryTokenBucketStore(), route_classes=route_classes)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                slow = await asyncio.gather(client.post("/slow"), client.post("/slow"))
+                read = await client.get("/items")
+            return slow, read
+
+        (first, second), read = asyncio.run(scenario())
+        assert sorted([first.status_code, second.status_code]) == [200, 503]
+        shed = first if first.status_code == 503 else second
+        assert shed.json() == {"detail": "Server busy (write capacity reached)"}
+        assert shed.headers["retry-after"] == "1"
+        # Other route classes keep their own capacity.
+        assert read.status_code == 200
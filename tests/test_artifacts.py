@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from utils import artifacts
+from utils.artifacts import (ArtifactBuildError, artifact_inputs, build_artifact, is_artifact_up_to_date,
+                             load_artifact, save_artifact)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """An empty project root (marked by its artifacts/ directory) as the working directory."""
+    (tmp_path / "artifacts").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestAtomicWrite:
+
+    def test_replaces_content_and_keeps_permissions(self, project):
+        target = project / "artifacts" / "doc.md"
+        artifacts.atomic_write(str(target), b"first")
+        assert oct(target.stat().st_mode & 0o777) == oct(0o644)
+        os.chmod(target, 0o640)
+        artifacts.atomic_write(str(target), b"second")
+        assert target.read_bytes() == b"second"
+        assert oct(target.stat().st_mode & 0o777) == oct(0o640)
+        assert [p.name for p in target.parent.iterdir()] == ["doc.md"]
+
+    def test_failed_write_leaves_original_and_no_temp_file(self, project, monkeypatch):
+        target = project / "artifacts" / "doc.md"
+        target.write_bytes(b"original")
+
+        def broken_replace(src, dst):
+            raise OSError("disk full")
+        monkeypatch.setattr(artifacts.os, "replace", broken_replace)
+        with pytest.raises(OSError):
+            artifacts.atomic_write(str(target), b"partial")
+        assert target.read_bytes() == b"original"
+        assert [p.name for p in target.parent.iterdir()] == ["doc.md"]
+
+
+class TestManifest:
+
+    def test_round_trip_and_up_to_date_detection(self, project):
+        inputs = artifact_inputs(prompt="Write a PRD", model="gpt-4.1")
+        save_artifact("# PRD", "artifacts/prd.md", inputs=inputs)
+        manifest = json.loads((project / "artifacts" / ".manifest.json").read_text())
+        assert manifest["artifacts/prd.md"]["inputs"] == inputs
+        assert is_artifact_up_to_date("artifacts/prd.md", inputs)
+        assert not is_artifact_up_to_date("artifacts/prd.md", artifact_inputs(prompt="Other", model="gpt-4.1"))
+
+        # A manual edit makes the artifact stale even with identical inputs.
+        (project / "artifacts" / "prd.md").write_text("# PRD (edited)")
+        assert not is_artifact_up_to_date("artifacts/prd.md", inputs)
+
+    def test_upstream_change_invalidates_dependents(self, project):
+        save_artifact("requirements v1", "artifacts/requirements.md")
+        inputs = artifact_inputs(prompt="p", depends_on=["artifacts/requirements.md"])
+        save_artifact("design", "artifacts/design.md", inputs=inputs)
+        assert is_artifact_up_to_date("artifacts/design.md", artifact_inputs(prompt="p", depends_on=["artifacts/requirements.md"]))
+        save_artifact("requirements v2", "artifacts/requirements.md")
+        assert not is_artifact_up_to_date("artifacts/design.md", artifact_inputs(prompt="p", depends_on=["artifacts/requirements.md"]))
+
+
+class TestBuildArtifact:
+
+    def test_generates_once_then_skips(self, project):
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return "content"
+        assert build_artifact("artifacts/out.md", generate, prompt="p", model="m") == "content"
+        assert build_artifact("artifacts/out.md", generate, prompt="p", model="m") == "content"
+        assert len(calls) == 1
+
+    def test_error_response_is_not_saved_or_recorded(self, project):
+        with pytest.raises(ArtifactBuildError):
+            build_artifact("artifacts/out.md", lambda: "An API error occurred: 503", prompt="p", model="m")
+        assert not (project / "artifacts" / "out.md").exists()
+        assert not is_artifact_up_to_date("artifacts/out.md", artifact_inputs(prompt="p", model="m"))
+        # The next run retries the stage.
+        assert build_artifact("artifacts/out.md", lambda: "content", prompt="p", model="m") == "content"
+        assert load_artifact("artifacts/out.md") == "content"
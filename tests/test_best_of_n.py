@@ -0,0 +1,58 @@
+import sys
+
+import pytest
+
+import best_of_n
+from best_of_n import evaluate_candidate, extract_code
+
+GOOD = "def add(a, b):\n    return a + b\n"
+BAD = "def add(a, b):\n    return a - b\n"
+SLOW = "import time\n\ndef add(a, b):\n    time.sleep(1.0)\n    return a + b\n"
+
+
+@pytest.fixture
+def tests_path(tmp_path):
+    path = tmp_path / "test_add.py"
+    path.write_text("from generated_function import add\n\n\ndef test_add():\n    assert add(2, 3) == 5\n")
+    return str(path)
+
+
+def test_extract_code_prefers_longest_compiling_block():
+    response = "Here:\n```python\nx = 1\n```\nand\n```python\n" + GOOD + "```"
+    assert extract_code(response) == GOOD
+    assert extract_code("```python\ndef broken(:\n```") is None
+
+
+def test_evaluate_candidate_pass_and_fail(tests_path):
+    assert evaluate_candidate(GOOD, tests_path)["passed"]
+    result = evaluate_candidate(BAD, tests_path)
+    assert not result["passed"] and "assert" in result["output"]
+
+
+@pytest.mark.skipif(best_of_n.resource is None, reason="rlimits are POSIX only")
+def test_memory_limit_applies_in_the_child(tests_path):
+    hog = "blob = bytearray(512 * 1024 * 1024)\n" + GOOD
+    result = evaluate_candidate(hog, tests_path, memory_mb=256)
+    assert not result["passed"] and "MemoryError" in result["output"]
+
+
+@pytest.mark.skipif(best_of_n.resource is None, reason="rlimits are POSIX only")
+def test_limits_are_applied_by_a_bootstrap_not_preexec_fn(tmp_path, monkeypatch):
+    calls = []
+    real_run = best_of_n.subprocess.run
+    monkeypatch.setattr(best_of_n.subprocess, "run", lambda *a, **kw: calls.append(kw) or real_run(*a, **kw))
+    returncode, output, _ = best_of_n._run_sandboxed(
+        [sys.executable, "-c", "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])"],
+        str(tmp_path), timeout=30, cpu_seconds=7, memory_mb=512)
+    assert returncode == 0 and output.strip() == "7"
+    assert "preexec_fn" not in calls[0]
+
+
+def test_best_of_n_picks_fastest_passing(tests_path, monkeypatch):
+    responses = [("m1", f"```python\n{SLOW}```"), ("m2", f"```python\n{BAD}```"),
+                 ("m1", f"```python\n{GOOD}```"), ("m2", "An API error occurred: 500")]
+    monkeypatch.setattr(best_of_n, "generate_candidates", lambda *args, **kwargs: responses)
+    best, candidates = best_of_n.best_of_n("spec", tests_path, n=4, models=("m1", "m2"))
+    assert best["index"] == 2
+    assert [c["passed"] for c in candidates] == [True, False, True, False]
+    assert candidates[3]["code"] is None and candidates[3]["output"].startswith("An API error")
@@ -0,0 +1,41 @@
+import sys
+import types
+
+import pytest
+
+from utils import clients
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Replaces the openai SDK with a recorder of constructor arguments."""
+    calls = []
+
+    class OpenAI:
+        def __init__(self, **kwargs):
+            calls.append(kwargs)
+
+    monkeypatch.setitem(sys.modules, "openai", types.SimpleNamespace(OpenAI=OpenAI))
+    monkeypatch.setattr(clients, "load_environment", lambda: None)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-real")
+    return calls
+
+
+def test_real_key_without_mock(fake_openai, monkeypatch):
+    monkeypatch.delenv("LLM_MOCK_BASE_URL", raising=False)
+    client, model, provider = clients.setup_llm_client("gpt-4.1-mini")
+    assert provider == "openai"
+    assert fake_openai == [{"api_key": "sk-real"}]
+
+
+def test_mock_base_url_never_receives_the_real_key(fake_openai, monkeypatch):
+    monkeypatch.setenv("LLM_MOCK_BASE_URL", "http://127.0.0.1:9000/")
+    clients.setup_llm_client("gpt-4.1-mini")
+    assert fake_openai == [{"api_key": clients.MOCK_API_KEY, "base_url": "http://127.0.0.1:9000/v1"}]
+
+
+def test_explicit_base_url_uses_the_placeholder_key(fake_openai, monkeypatch):
+    monkeypatch.delenv("LLM_MOCK_BASE_URL", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY")
+    client, _, _ = clients.setup_llm_client("gpt-4.1-mini", base_url="http://localhost:9000")
+    assert client is not None and fake_openai[0]["api_key"] == clients.MOCK_API_KEY
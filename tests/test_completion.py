@@ -0,0 +1,99 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from utils import clients
+from utils.completion import get_completion, is_error_response, map_reduce_completion
+
+
+class FakeAnthropic:
+    """Records prompts and answers each with a scripted reply (default: a short tag)."""
+
+    def __init__(self, reply=None):
+        self.prompts = []
+        self.reply = reply or (lambda prompt: f"summary {len(self.prompts)}")
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, model, max_tokens, temperature, messages):
+        prompt = messages[0]["content"]
+        with self._lock:
+            self.prompts.append(prompt)
+            text = self.reply(prompt)
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+@pytest.fixture
+def tiny_model(monkeypatch):
+    monkeypatch.setitem(clients.RECOMMENDED_MODELS, "tiny", {"provider": "anthropic", "context_window": 1000,
+                                                             "max_output": 200})
+    return "tiny"
+
+
+def _long_text(paragraphs=40):
+    return "\n\n".join(f"Paragraph {i}. " + "word " * 40 for i in range(paragraphs))
+
+
+def test_is_error_response():
+    assert is_error_response("An API error occurred: 500")
+    assert is_error_response("API client not initialized.")
+    assert is_error_response("Error: Prompt of ~9000 tokens exceeds the 8192-token context window of 'x'.")
+    assert is_error_response("Error: Model 'x' does not support vision.")
+    assert is_error_response(None)
+    assert not is_error_response("All good")
+    # A model answer may legitimately start with "Error:"
+    assert not is_error_response("Error: undefined variable `x` on line 3 means the import is missing.")
+
+
+def test_oversized_prompt_is_rejected_without_a_request(tiny_model):
+    client = FakeAnthropic()
+    response = get_completion(_long_text(), client, tiny_model, "anthropic")
+    assert is_error_response(response) and "context window" in response
+    assert client.prompts == []
+
+
+def test_truncate_overflow_sends_a_fitting_prompt(tiny_model):
+    client = FakeAnthropic()
+    get_completion(_long_text(), client, tiny_model, "anthropic", overflow="truncate")
+    assert len(client.prompts) == 1 and "truncated to fit" in client.prompts[0]
+
+
+def test_map_reduce_maps_every_chunk_then_reduces(tiny_model):
+    client = FakeAnthropic()
+    text = _long_text()
+    response = map_reduce_completion("Summarize.", text, client, tiny_model, "anthropic")
+    map_prompts = [p for p in client.prompts if "This is part" in p]
+    reduce_prompts = [p for p in client.prompts if "Combine the partial results" in p]
+    assert len(map_prompts) > 1 and len(reduce_prompts) == 1
+    assert len(client.prompts) == len(map_prompts) + 1
+    # Every paragraph reaches exactly one map call, and every partial reaches the reduce call.
+    for i in range(40):
+        assert sum(f"Paragraph {i}." in p for p in map_prompts) == 1
+    assert all(f"--- Part {n} ---" in reduce_prompts[0] for n in range(1, len(map_prompts) + 1))
+    assert response.startswith("summary")
+
+
+def test_map_reduce_single_chunk_skips_reduce(tiny_model):
+    client = FakeAnthropic()
+    assert map_reduce_completion("Summarize.", "short text", client, tiny_model, "anthropic") == "summary 1"
+    assert len(client.prompts) == 1
+
+
+def test_map_reduce_returns_first_failed_partial(tiny_model):
+    client = FakeAnthropic(reply=lambda prompt: "An API error occurred: boom" if "part 2 of" in prompt else "ok")
+    response = map_reduce_completion("Summarize.", _long_text(), client, tiny_model, "anthropic")
+    assert response == "An API error occurred: boom"
+    assert not any("Combine the partial results" in p for p in client.prompts)
+
+
+def test_map_reduce_rejects_instruction_that_leaves_no_room(tiny_model):
+    client = FakeAnthropic()
+    response = map_reduce_completion("x" * 4000, "text", client, tiny_model, "anthropic")
+    assert is_error_response(response) and client.prompts == []
+
+
+def test_get_completion_map_reduce_overflow(tiny_model):
+    client = FakeAnthropic()
+    get_completion(_long_text(), client, tiny_model, "anthropic", overflow="map_reduce")
+    assert any("Combine the partial results" in p for p in client.prompts)
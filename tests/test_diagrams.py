@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from utils import diagrams
+from utils.diagrams import LocalPlantUMLBackend, render_diagram, render_diagrams, set_diagram_backend
+
+
+class StubBackend:
+    """Returns fake PNG bytes derived from the source and counts render calls."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def render(self, source, theme="default"):
+        if "fail" in source:
+            raise RuntimeError("renderer unavailable")
+        with self._lock:
+            self.calls.append((source, theme))
+        return f"PNG:{theme}:{source}".encode("utf-8")
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    (tmp_path / "artifacts").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(diagrams, "_memory_cache", {})
+    monkeypatch.setattr(diagrams, "DIAGRAM_BACKENDS", dict(diagrams.DIAGRAM_BACKENDS))
+    stub = StubBackend()
+    set_diagram_backend("mermaid", stub)
+    return stub
+
+
+class TestRenderCache:
+
+    def test_memory_then_disk_cache(self, backend, tmp_path, monkeypatch):
+        first = render_diagram("mermaid", "graph TD; A-->B")
+        assert render_diagram("mermaid", "graph TD; A-->B") == first
+        assert len(backend.calls) == 1
+        assert len(list((tmp_path / diagrams.CACHE_DIR).iterdir())) == 1
+
+        # A fresh process (empty memory cache) is served from disk.
+        monkeypatch.setattr(diagrams, "_memory_cache", {})
+        assert render_diagram("mermaid", "graph TD; A-->B") == first
+        assert len(backend.calls) == 1
+
+    def test_theme_and_source_are_part_of_the_key(self, backend):
+        render_diagram("mermaid", "graph TD; A-->B")
+        render_diagram("mermaid", "graph TD; A-->B", theme="dark")
+        render_diagram("mermaid", "graph TD; A-->C")
+        assert len(backend.calls) == 3
+
+    def test_switching_backend_bypasses_the_old_renders(self, backend, tmp_path, monkeypatch):
+        render_diagram("mermaid", "graph TD; A-->B")
+        other = StubBackend()
+        other.cache_id = "other-renderer"
+        set_diagram_backend("mermaid", other)
+        render_diagram("mermaid", "graph TD; A-->B")
+        assert len(other.calls) == 1
+        # Neither the memory nor the disk cache of the first backend was reused.
+        monkeypatch.setattr(diagrams, "_memory_cache", {})
+        render_diagram("mermaid", "graph TD; A-->B")
+        assert len(other.calls) == 1
+        assert len(list((tmp_path / diagrams.CACHE_DIR).iterdir())) == 2
+
+    def test_backend_ids_reflect_configuration(self):
+        assert diagrams._backend_id(diagrams.PlantUMLServerBackend()) != diagrams._backend_id(
+            LocalPlantUMLBackend("plantuml.jar"))
+        assert diagrams._backend_id(StubBackend()).endswith("StubBackend")
+
+
+class TestRenderDiagrams:
+
+    def test_renders_concurrently_and_reports_failures(self, backend, tmp_path):
+        specs = [{"kind": "mermaid", "source": f"graph TD; A-->N{i}", "output_path": f"artifacts/d{i}.png"}
+                 for i in range(5)]
+        specs.append({"kind": "mermaid", "source": "fail", "output_path": "artifacts/bad.png"})
+        paths = render_diagrams(specs, max_workers=4)
+        assert paths[-1] is None
+        for i, path in enumerate(paths[:-1]):
+            assert open(path, "rb").read() == f"PNG:default:graph TD; A-->N{i}".encode("utf-8")
+        assert not (tmp_path / "artifacts" / "bad.png").exists()
+
+
+class TestPlantUMLTheme:
+
+    def test_theme_directive_reaches_the_renderer(self, monkeypatch):
+        sent = {}
+
+        class Completed:
+            stdout = b"PNG"
+
+        def fake_run(args, input, **kwargs):
+            sent["source"] = input.decode("utf-8")
+            return Completed()
+        monkeypatch.setattr(diagrams.subprocess, "run", fake_run)
+
+        LocalPlantUMLBackend("plantuml.jar").render("@startuml\nA -> B\n@enduml", theme="cerulean")
+        assert sent["source"] == "@startuml\n!theme cerulean\nA -> B\n@enduml"
+        LocalPlantUMLBackend("plantuml.jar").render("@startuml\nA -> B\n@enduml")
+        assert "!theme" not in sent["source"]
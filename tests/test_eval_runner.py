@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import eval_runner
+from eval_runner import RunningStats, run_evaluation
+
+
+class TestRunningStats:
+
+    def test_mean_stddev_and_pass_rate(self):
+        stats = RunningStats(pass_threshold=4)
+        for score in (5, 3, 4, None):
+            stats.add(score)
+        assert stats.summary() == {"scored": 3, "errors": 1, "mean_score": 4.0, "stddev": 1.0, "pass_rate": 0.667}
+
+    def test_empty(self):
+        assert RunningStats(4).summary() == {"scored": 0, "errors": 0, "mean_score": 0.0, "stddev": 0.0, "pass_rate": 0.0}
+
+
+@pytest.fixture
+def judge(monkeypatch):
+    """Stubs the LLM: candidates echo their input, the judge scores by the digit in the response."""
+    calls = []
+    failing = set()
+
+    def fake_completion(prompt, client, model_name, api_provider, temperature=0.7):
+        calls.append((model_name, prompt))
+        if model_name == "judge":
+            output = prompt.split("<response>\n")[1].split("\n</response>")[0]
+            if output in failing:
+                return "An API error occurred: 500"
+            return json.dumps({"score": int(output[-1]), "reasoning": "ok"})
+        return prompt
+
+    monkeypatch.setattr(eval_runner, "setup_llm_client", lambda name: (object(), name, "openai"))
+    monkeypatch.setattr(eval_runner, "get_completion", fake_completion)
+    return calls, failing
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text("\n".join(json.dumps({"id": i, "input": f"item {i}"}) for i in (5, 4, 2)) + "\n")
+    return str(path)
+
+
+def _records(path):
+    return [json.loads(line) for line in open(path)]
+
+
+class TestResume:
+
+    def test_resume_skips_scored_and_retries_errors(self, judge, dataset, tmp_path):
+        calls, failing = judge
+        checkpoint = str(tmp_path / "results.jsonl")
+        failing.add("item 2")
+        first = run_evaluation(dataset, "rubric", ["model"], judge_model="judge", checkpoint_path=checkpoint,
+                               requests_per_second=None)
+        assert first["model"]["scored"] == 2 and first["model"]["errors"] == 1
+
+        failing.clear()
+        calls.clear()
+        second = run_evaluation(dataset, "rubric", ["model"], judge_model="judge", checkpoint_path=checkpoint,
+                                requests_per_second=None)
+        assert [prompt for model, prompt in calls if model == "model"] == ["item 2"]
+        assert second["model"] == {"scored": 3, "errors": 0, "mean_score": 3.667, "stddev": 1.528, "pass_rate": 0.667}
+
+    def test_torn_final_line_is_dropped_before_appending(self, judge, dataset, tmp_path):
+        checkpoint = tmp_path / "results.jsonl"
+        complete = {"model": "model", "id": 5, "score": 5, "reasoning": "ok", "output": "item 5"}
+        checkpoint.write_text(json.dumps(complete) + "\n" + '{"model": "model", "id": 4, "sco')
+
+        run_evaluation(dataset, "rubric", ["model"], judge_model="judge", checkpoint_path=str(checkpoint),
+                       requests_per_second=None)
+        records = _records(checkpoint)
+        assert sorted(r["id"] for r in records) == [2, 4, 5]
+
+        # Every record survives a further resume.
+        summary = run_evaluation(dataset, "rubric", ["model"], judge_model="judge", checkpoint_path=str(checkpoint),
+                                 requests_per_second=None)
+        assert summary["model"]["scored"] == 3
+
+
+class TestRateLimits:
+
+    def test_one_limiter_per_provider(self, judge, dataset, tmp_path, monkeypatch):
+        providers = {"model": "gemini", "judge": "openai"}
+        monkeypatch.setattr(eval_runner, "setup_llm_client", lambda name: (object(), name, providers[name]))
+        rates = {}
+
+        class RecordingLimiter:
+            def __init__(self, rate):
+                self.rate, self.calls = rate, 0
+
+            def wait(self):
+                self.calls += 1
+
+        def make_limiter(rate):
+            limiter = RecordingLimiter(rate)
+            rates.setdefault(rate, []).append(limiter)
+            return limiter
+
+        monkeypatch.setattr(eval_runner, "RateLimiter", make_limiter)
+        run_evaluation(dataset, "rubric", ["model"], judge_model="judge", checkpoint_path=str(tmp_path / "r.jsonl"),
+                       requests_per_second=5.0, provider_rps={"openai": 50.0})
+        # gemini uses the default rate and openai its override; each sees only its own calls.
+        assert {rate: [l.calls for l in limiters] for rate, limiters in rates.items()} == {5.0: [3], 50.0: [3]}
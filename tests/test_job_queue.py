@@ -0,0 +1,100 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+
+from job_queue import JobQueue, Job, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+
+
+def _handlers():
+    def echo(payload, report_progress):
+        report_progress(0.5)
+        return {"echo": payload}
+
+    def boom(payload, report_progress):
+        raise RuntimeError("generation failed")
+    return {"echo": echo, "boom": boom}
+
+
+def _wait_for(queue, job_id, timeout=5.0):
+    async def poll():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = queue.get(job_id)
+            if job["status"] in (JOB_SUCCEEDED, JOB_FAILED):
+                return job
+            await asyncio.sleep(0.02)
+        raise AssertionError(f"job {job_id} did not finish")
+    return poll()
+
+
+class TestEnqueueAndClaim:
+
+    def test_enqueue_persists_job(self, engine):
+        queue = JobQueue(engine, _handlers())
+        job = queue.enqueue("echo", {"x": 1}, priority=3)
+        assert job["status"] == JOB_QUEUED and job["priority"] == 3
+        assert queue.get(job["id"])["id"] == job["id"]
+        assert queue.get(9999) is None
+
+    def test_unknown_kind_rejected(self, engine):
+        with pytest.raises(ValueError):
+            JobQueue(engine, _handlers()).enqueue("missing")
+
+    def test_claims_highest_priority_then_oldest(self, engine):
+        queue = JobQueue(engine, _handlers())
+        low = queue.enqueue("echo", priority=0)
+        high_old = queue.enqueue("echo", priority=5)
+        high_new = queue.enqueue("echo", priority=5)
+        claimed = [queue._claim()[0] for _ in range(3)]
+        assert claimed == [high_old["id"], high_new["id"], low["id"]]
+        assert queue._claim() is None
+        assert queue.get(low["id"])["status"] == JOB_RUNNING
+
+
+class TestLeases:
+
+    def test_live_lease_is_not_requeued_by_another_process(self, engine):
+        running = JobQueue(engine, _handlers())
+        job = running.enqueue("echo")
+        running._claim()
+        sibling = JobQueue(engine, _handlers())
+        assert sibling._requeue_expired() == 0
+        assert sibling.get(job["id"])["status"] == JOB_RUNNING
+
+    def test_expired_lease_is_requeued(self, engine):
+        crashed = JobQueue(engine, _handlers())
+        job = crashed.enqueue("echo")
+        crashed._claim()
+        with engine.begin() as conn:
+            conn.execute(update(Job).values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        sibling = JobQueue(engine, _handlers())
+        assert sibling._requeue_expired() == 1
+        assert sibling.get(job["id"])["status"] == JOB_QUEUED
+        # The crashed worker's late result is discarded rather than overwriting the new run.
+        assert crashed._update(job["id"], status=JOB_SUCCEEDED) is False
+
+
+class TestWorkers:
+
+    def test_runs_jobs_and_records_failures(self, engine):
+        async def scenario():
+            queue = JobQueue(engine, _handlers(), poll_interval=0.05)
+            await queue.start()
+            try:
+                ok = queue.enqueue("echo", {"x": 1})
+                bad = queue.enqueue("boom")
+                return await _wait_for(queue, ok["id"]), await _wait_for(queue, bad["id"])
+            finally:
+                await queue.stop()
+
+        ok, bad = asyncio.run(scenario())
+        assert ok["status"] == JOB_SUCCEEDED and ok["result"] == {"echo": {"x": 1}} and ok["progress"] == 1.0
+        assert bad["status"] == JOB_FAILED and bad["error"] == "generation failed"
@@ -0,0 +1,82 @@
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("mcp")
+
+MAIN_PATH = os.path.join(os.path.dirname(__file__), "..", "Labs", "Day_07_Advanced_Agent_Workflows", "main.py")
+
+
+@pytest.fixture
+def server():
+    """The Day 7 MCP server module, loaded by path with an empty tool cache."""
+    spec = importlib.util.spec_from_file_location("day07_mcp_server", MAIN_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module._tool_cache.clear()
+    return module
+
+
+def _batch(server, calls):
+    return asyncio.run(server.batch(calls))
+
+
+class TestPureTool:
+
+    def test_cache_hit_skips_the_call(self, server):
+        calls = []
+
+        @server.pure_tool
+        async def square(x: int) -> int:
+            calls.append(x)
+            return x * x
+
+        assert [asyncio.run(square(3)), asyncio.run(square(3)), asyncio.run(square(x=3))] == [9, 9, 9]
+        # Positional and keyword calls are keyed separately
+        assert calls == [3, 3]
+
+    def test_lru_eviction_at_cache_size(self, server, monkeypatch):
+        monkeypatch.setattr(server, "TOOL_CACHE_SIZE", 2)
+        calls = []
+
+        @server.pure_tool
+        async def echo(x):
+            calls.append(x)
+            return x
+
+        for x in (1, 2, 1, 3):  # touching 1 makes 2 the least recently used
+            asyncio.run(echo(x))
+        assert len(server._tool_cache) == 2
+        asyncio.run(echo(1))
+        asyncio.run(echo(2))
+        assert calls == [1, 2, 3, 2]
+
+
+class TestBatch:
+
+    def test_results_in_order(self, server):
+        results = _batch(server, [{"tool": "add", "arguments": {"a": 2, "b": 3}},
+                                  {"tool": "multiply", "arguments": {"a": 4, "b": 5}}])
+        assert results == [{"result": 5}, {"result": 20}]
+
+    def test_arguments_are_coerced_before_the_cache(self, server):
+        results = _batch(server, [{"tool": "add", "arguments": {"a": "2", "b": "3"}}])
+        assert results == [{"result": 5}]
+        # The coerced call is cached as ints, so a direct call shares the entry
+        assert all('"2"' not in key[1] for key in server._tool_cache)
+        assert _batch(server, [{"tool": "add", "arguments": {"a": 2, "b": 3}}]) == [{"result": 5}]
+
+    def test_each_call_is_validated_separately(self, server):
+        results = _batch(server, [{"tool": "add", "arguments": {"a": "x", "b": 3}},
+                                  {"tool": "add", "arguments": {"a": 1}},
+                                  {"tool": "multiply", "arguments": {"a": 2, "b": 2}}])
+        assert "valid integer" in results[0]["error"]
+        assert "error" in results[1]
+        assert results[2] == {"result": 4}
+        assert len(server._tool_cache) == 1
+
+    def test_unknown_and_non_batchable_tools(self, server):
+        results = _batch(server, [{"tool": "divide", "arguments": {}}, {"tool": "batch", "arguments": {"calls": []}}])
+        assert results == [{"error": "Unknown tool 'divide'"}, {"error": "Unknown tool 'batch'"}]
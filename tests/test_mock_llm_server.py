@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import mock_llm_server
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """A mock with no latency, short canned answers and a fresh cassette."""
+    monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "mode", "canned")
+    monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "latency_ms", 0.0)
+    monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "tokens_per_sec", 1e6)
+    monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "response_tokens", 12)
+    monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "error_rate", 0.0)
+    monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "cassette", str(tmp_path / "cassette.jsonl"))
+    monkeypatch.setattr(mock_llm_server, "_cassette", {})
+    return TestClient(mock_llm_server.app)
+
+
+def _events(response):
+    """Parses an SSE body into [(event name or None, data)]."""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        data = lines["data"]
+        events.append((lines.get("event"), data if data == "[DONE]" else json.loads(data)))
+    return events
+
+
+OPENAI_BODY = {"model": "gpt-4.1-mini", "messages": [{"role": "user", "content": "hello"}]}
+ANTHROPIC_BODY = {"model": "claude-3-5-haiku-20241022", "max_tokens": 64,
+                  "messages": [{"role": "user", "content": "hello"}]}
+
+
+class TestOpenAI:
+
+    def test_non_streaming(self, client):
+        data = client.post("/v1/chat/completions", json=OPENAI_BODY).json()
+        assert data["object"] == "chat.completion" and data["model"] == "gpt-4.1-mini"
+        message = data["choices"][0]["message"]
+        assert message["role"] == "assistant" and message["content"].startswith("Mock response to: 'hello'")
+        assert data["usage"]["total_tokens"] == data["usage"]["prompt_tokens"] + data["usage"]["completion_tokens"]
+
+    def test_streaming_matches_non_streaming(self, client):
+        text = client.post("/v1/chat/completions", json=OPENAI_BODY).json()["choices"][0]["message"]["content"]
+        response = client.post("/v1/chat/completions", json={**OPENAI_BODY, "stream": True})
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [data for _, data in _events(response)]
+        assert events[-1] == "[DONE]"
+        chunks = events[:-1]
+        assert all(chunk["object"] == "chat.completion.chunk" for chunk in chunks)
+        assert chunks[0]["choices"][0]["delta"]["role"] == "assistant"
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+        assert "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks) == text
+
+    def test_rate_limit_injection(self, client, monkeypatch):
+        monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "error_rate", 1.0)
+        response = client.post("/v1/chat/completions", json=OPENAI_BODY)
+        assert response.status_code == 429 and response.headers["retry-after"] == "1"
+        assert response.json()["error"]["code"] == "rate_limit_exceeded"
+
+
+class TestAnthropic:
+
+    def test_non_streaming(self, client):
+        data = client.post("/v1/messages", json=ANTHROPIC_BODY).json()
+        assert data["type"] == "message" and data["stop_reason"] == "end_turn"
+        assert data["content"][0]["text"].startswith("Mock response to: 'hello'")
+        assert data["usage"]["output_tokens"] > 0
+
+    def test_streaming_matches_non_streaming(self, client):
+        text = client.post("/v1/messages", json=ANTHROPIC_BODY).json()["content"][0]["text"]
+        events = _events(client.post("/v1/messages", json={**ANTHROPIC_BODY, "stream": True}))
+        names = [name for name, _ in events]
+        assert names[:2] == ["message_start", "content_block_start"]
+        assert names[-3:] == ["content_block_stop", "message_delta", "message_stop"]
+        assert all(name == data["type"] for name, data in events)
+        deltas = [data["delta"]["text"] for name, data in events if name == "content_block_delta"]
+        assert "".join(deltas) == text
+
+    def test_rate_limit_injection(self, client, monkeypatch):
+        monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "error_rate", 1.0)
+        response = client.post("/v1/messages", json=ANTHROPIC_BODY)
+        assert response.status_code == 429
+        assert response.json()["error"]["type"] == "rate_limit_error"
+
+
+class TestRecordReplay:
+
+    def test_record_saves_and_replay_serves_cassette(self, client, monkeypatch):
+        recorded = []
+
+        async def fake_record(provider, body, headers):
+            recorded.append(provider)
+            return "recorded answer"
+
+        monkeypatch.setattr(mock_llm_server, "_record", fake_record)
+        monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "mode", "record")
+        for _ in range(2):
+            data = client.post("/v1/chat/completions", json=OPENAI_BODY).json()
+            assert data["choices"][0]["message"]["content"] == "recorded answer"
+        assert recorded == ["openai"]
+
+        monkeypatch.setattr(mock_llm_server, "_cassette", {})
+        monkeypatch.setitem(mock_llm_server.MOCK_CONFIG, "mode", "replay")
+        mock_llm_server._load_cassette()
+        data = client.post("/v1/chat/completions", json=OPENAI_BODY).json()
+        assert data["choices"][0]["message"]["content"] == "recorded answer"
+        # A request missing from the cassette falls back to the canned answer.
+        other = {**OPENAI_BODY, "messages": [{"role": "user", "content": "other"}]}
+        content = client.post("/v1/chat/completions", json=other).json()["choices"][0]["message"]["content"]
+        assert content.startswith("Mock response to: 'other'")
+
+    def test_upstream_credentials_come_from_the_server(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-server")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-server")
+        client_headers = {"authorization": "Bearer mock", "x-api-key": "mock", "content-type": "application/json"}
+        assert mock_llm_server._upstream_headers("openai", client_headers)["authorization"] == "Bearer sk-server"
+        anthropic = mock_llm_server._upstream_headers("anthropic", client_headers)
+        assert anthropic["x-api-key"] == "sk-ant-server" and "authorization" not in anthropic
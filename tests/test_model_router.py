@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+import model_router
+from model_router import ModelRouter
+
+MODELS = {
+    "fast-expensive": {"provider": "openai", "vision": True},
+    "slow-cheap": {"provider": "openai", "vision": False},
+    "mid": {"provider": "anthropic", "vision": True},
+}
+
+
+@pytest.fixture
+def router(monkeypatch):
+    """A router over three fake models whose completions are scripted per test."""
+    monkeypatch.setitem(model_router.MODEL_COSTS, "fast-expensive", 50.0)
+    monkeypatch.setitem(model_router.MODEL_COSTS, "slow-cheap", 1.0)
+    monkeypatch.setitem(model_router.MODEL_COSTS, "mid", 10.0)
+    behaviour = {}
+
+    def fake_completion(prompt, client, model_name, api_provider, temperature=0.7):
+        delay, response = behaviour.get(model_name, (0.0, f"answer from {model_name}"))
+        time.sleep(delay)
+        return response
+
+    monkeypatch.setattr(model_router, "get_completion", fake_completion)
+    r = ModelRouter(models=MODELS, cooldown=30.0)
+    monkeypatch.setattr(r, "_client_for", lambda name: (object(), name, MODELS[name]["provider"]))
+    r.behaviour = behaviour
+    return r
+
+
+def _seed_latency(router, name, seconds, samples=10):
+    for _ in range(samples):
+        router.stats[name].record(seconds, True, tokens=100)
+
+
+class TestRanking:
+
+    def test_fastest_and_cheapest_policies(self, router):
+        _seed_latency(router, "fast-expensive", 0.1)
+        _seed_latency(router, "slow-cheap", 2.0)
+        _seed_latency(router, "mid", 0.5)
+        assert router.rank("fastest") == ["fast-expensive", "mid", "slow-cheap"]
+        assert router.rank("cheapest") == ["slow-cheap", "mid", "fast-expensive"]
+        assert router.rank("throughput") == ["fast-expensive", "mid", "slow-cheap"]
+
+    def test_unmeasured_models_sort_last(self, router):
+        _seed_latency(router, "mid", 0.5)
+        assert router.rank("fastest")[0] == "mid"
+
+    def test_capability_filters(self, router):
+        assert set(router.rank(vision=True)) == {"fast-expensive", "mid"}
+        assert router.rank(provider="anthropic") == ["mid"]
+
+    def test_max_p95_demotes_instead_of_dropping(self, router):
+        _seed_latency(router, "fast-expensive", 0.1)
+        _seed_latency(router, "slow-cheap", 3.0)
+        _seed_latency(router, "mid", 1.0)
+        assert router.rank("cheapest", max_p95=2.0) == ["mid", "fast-expensive", "slow-cheap"]
+
+    def test_recent_failure_demotes_model(self, router):
+        _seed_latency(router, "fast-expensive", 0.1)
+        _seed_latency(router, "mid", 0.5)
+        router.stats["fast-expensive"].record(0.1, False)
+        assert router.rank("fastest", vision=True) == ["mid", "fast-expensive"]
+
+
+class TestComplete:
+
+    def test_returns_best_ranked_answer(self, router):
+        _seed_latency(router, "mid", 0.01)
+        assert router.complete("hi", hedge_percentile=None) == ("answer from mid", "mid")
+
+    def test_falls_back_on_failure(self, router):
+        _seed_latency(router, "mid", 0.01)
+        _seed_latency(router, "fast-expensive", 0.02)
+        router.behaviour["mid"] = (0.0, "An API error occurred: 500")
+        response, name = router.complete("hi", hedge_percentile=None)
+        assert (response, name) == ("answer from fast-expensive", "fast-expensive")
+        assert router.stats["mid"].last_failure > 0
+
+    def test_total_failure_returns_last_error(self, router):
+        for name in MODELS:
+            router.behaviour[name] = (0.0, f"An API error occurred: {name} down")
+        response, name = router.complete("hi", hedge_percentile=None)
+        assert response == f"An API error occurred: {name} down"
+
+    def test_no_matching_model(self, router):
+        response, name = router.complete("hi", provider="gemini")
+        assert name is None and response.startswith("Error: No model matches")
+
+    def test_hedge_fires_past_percentile(self, router):
+        _seed_latency(router, "mid", 0.02)
+        _seed_latency(router, "fast-expensive", 0.03)
+        router.behaviour["mid"] = (1.0, "late answer from mid")
+        start = time.monotonic()
+        response, name = router.complete("hi", vision=True, hedge_percentile=95)
+        assert (response, name) == ("answer from fast-expensive", "fast-expensive")
+        assert time.monotonic() - start < 0.5
+
+    def test_oversized_prompt_skips_model_without_recording_failure(self, router, monkeypatch):
+        monkeypatch.setitem(model_router.RECOMMENDED_MODELS, "mid", {"provider": "anthropic", "context_window": 1000,
+                                                                     "max_output": 100})
+        _seed_latency(router, "mid", 0.01)
+        _seed_latency(router, "fast-expensive", 0.02)
+        response, name = router.complete("word " * 1000, hedge_percentile=None)
+        assert name == "fast-expensive"
+        assert router.stats["mid"].last_failure == 0.0 and router.stats["mid"].error_rate == 0.0
+
+    def test_prompt_too_large_for_every_model(self, router):
+        response, name = router.complete("word " * 100000, hedge_percentile=None)
+        assert name is None and "does not fit" in response
+        assert model_router.is_error_response(response)
+        assert all(stats.last_failure == 0.0 for stats in router.stats.values())
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import plan_executor
+import utils
+from plan_executor import PlanExecutionError, execute_plan, llm_step
+
+
+def _sleep_step(name, seconds=0.2, log=None):
+    async def step(inputs):
+        if log is not None:
+            log.append(name)
+        await asyncio.sleep(seconds)
+        return f"{name}({','.join(sorted(inputs))})"
+    return step
+
+
+class TestScheduling:
+
+    def test_independent_steps_run_concurrently(self):
+        steps = {
+            "flights": {"fn": _sleep_step("flights")},
+            "hotels": {"fn": _sleep_step("hotels")},
+            "itinerary": {"fn": _sleep_step("itinerary", 0.0), "depends_on": ["flights", "hotels"]},
+        }
+        start = time.monotonic()
+        results = execute_plan(steps, max_concurrency=4)
+        assert time.monotonic() - start < 0.35
+        assert results["itinerary"] == "itinerary(flights,hotels)"
+
+    def test_concurrency_cap(self):
+        steps = {name: {"fn": _sleep_step(name, 0.1)} for name in ("a", "b", "c")}
+        start = time.monotonic()
+        execute_plan(steps, max_concurrency=1)
+        assert time.monotonic() - start >= 0.3
+
+    def test_sync_steps_run_in_threads(self):
+        steps = {"a": {"fn": lambda inputs: 1}, "b": {"fn": lambda inputs: inputs["a"] + 1, "depends_on": ["a"]}}
+        assert execute_plan(steps) == {"a": 1, "b": 2}
+
+
+class TestValidation:
+
+    def test_cycle_detected(self):
+        steps = {"a": {"fn": _sleep_step("a"), "depends_on": ["b"]},
+                 "b": {"fn": _sleep_step("b"), "depends_on": ["a"]}}
+        with pytest.raises(ValueError, match="cycle"):
+            execute_plan(steps)
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError, match="unknown step"):
+            execute_plan({"a": {"fn": _sleep_step("a"), "depends_on": ["missing"]}})
+
+
+class TestCheckpointing:
+
+    def test_failure_then_resume_skips_completed_steps(self, tmp_path):
+        checkpoint = str(tmp_path / "plan.json")
+        log = []
+        attempts = []
+
+        def flaky(inputs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("provider down")
+            return "booked"
+
+        steps = {
+            "flights": {"fn": _sleep_step("flights", 0.01, log)},
+            "hotels": {"fn": flaky},
+            "itinerary": {"fn": _sleep_step("itinerary", 0.0, log), "depends_on": ["flights", "hotels"]},
+        }
+        with pytest.raises(PlanExecutionError) as excinfo:
+            execute_plan(steps, checkpoint_path=checkpoint)
+        assert excinfo.value.step_id == "hotels"
+        assert json.load(open(checkpoint)) == {"flights": "flights()"}
+
+        results = execute_plan(steps, checkpoint_path=checkpoint)
+        assert results["hotels"] == "booked"
+        assert log == ["flights", "itinerary"]
+
+    def test_checkpoint_is_written_off_the_event_loop(self, tmp_path, monkeypatch):
+        writers = []
+        real_write = plan_executor.atomic_write
+        monkeypatch.setattr(plan_executor, "atomic_write",
+                            lambda path, data: writers.append(threading.get_ident()) or real_write(path, data))
+        checkpoint = tmp_path / "plan.json"
+        execute_plan({"a": {"fn": lambda inputs: 1}, "b": {"fn": lambda inputs: 2, "depends_on": ["a"]}},
+                     checkpoint_path=str(checkpoint))
+        assert len(writers) == 2 and threading.get_ident() not in writers
+        assert json.loads(checkpoint.read_text()) == {"a": 1, "b": 2}
+        assert [p.name for p in tmp_path.iterdir()] == ["plan.json"]
+
+    def test_non_json_result_fails_loudly(self, tmp_path):
+        checkpoint = str(tmp_path / "plan.json")
+        with pytest.raises(PlanExecutionError) as excinfo:
+            execute_plan({"a": {"fn": lambda inputs: {1, 2}}}, checkpoint_path=checkpoint)
+        assert isinstance(excinfo.value.error, TypeError)
+
+    def test_llm_error_is_not_checkpointed(self, tmp_path, monkeypatch):
+        checkpoint = str(tmp_path / "plan.json")
+        monkeypatch.setattr(utils, "get_completion", lambda *args, **kwargs: "An API error occurred: 503")
+        steps = {"summary": {"fn": llm_step("Summarize", object(), "gpt-4.1", "openai")}}
+        with pytest.raises(PlanExecutionError):
+            execute_plan(steps, checkpoint_path=checkpoint)
+
+        monkeypatch.setattr(utils, "get_completion", lambda *args, **kwargs: "A summary.")
+        assert execute_plan(steps, checkpoint_path=checkpoint) == {"summary": "A summary."}
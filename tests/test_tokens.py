@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from utils import clients, tokens
+from utils.tokens import (chunk_text, context_limits, estimate_tokens, fits_context, output_budget,
+                          truncate_to_tokens, context_window_error, CONTEXT_WINDOW_ERROR_PREFIX, DEFAULT_CONTEXT_WINDOW,
+                          DEFAULT_MAX_OUTPUT_TOKENS)
+
+
+@pytest.fixture
+def tiny_model(monkeypatch):
+    """A heuristic-counted model with a 1000-token window and 200-token output limit."""
+    monkeypatch.setitem(clients.RECOMMENDED_MODELS, "tiny", {"provider": "anthropic", "context_window": 1000,
+                                                             "max_output": 200})
+    return "tiny"
+
+
+def test_estimate_uses_provider_ratio_with_margin(tiny_model):
+    text = "x" * 350
+    assert estimate_tokens(text, tiny_model) == math.ceil(350 / 3.5 * tokens.SAFETY_MARGIN)
+    assert estimate_tokens("", tiny_model) == 0
+
+
+def test_context_limits_defaults_for_unknown_models(tiny_model):
+    assert context_limits(tiny_model) == (1000, 200)
+    assert context_limits("unknown-model") == (DEFAULT_CONTEXT_WINDOW,
+                                               min(DEFAULT_MAX_OUTPUT_TOKENS, DEFAULT_CONTEXT_WINDOW // 2))
+
+
+def test_output_budget_is_capped_by_model_and_remaining_window(tiny_model):
+    assert output_budget(100, tiny_model) == 200
+    assert output_budget(100, tiny_model, max_tokens=50) == 50
+    assert output_budget(900, tiny_model) == 100
+    assert output_budget(1200, tiny_model) == 0
+
+
+def test_fits_context_reserves_output(tiny_model):
+    assert fits_context("x" * 2000, tiny_model)
+    assert not fits_context("x" * 2800, tiny_model)
+    assert fits_context("x" * 2800, tiny_model, max_tokens=10)
+
+
+def test_truncate_keeps_head_and_tail(tiny_model):
+    text = "HEAD " + "middle " * 2000 + " TAIL"
+    truncated = truncate_to_tokens(text, 300, tiny_model)
+    assert truncated.startswith("HEAD") and truncated.endswith("TAIL")
+    assert "truncated to fit" in truncated
+    assert estimate_tokens(truncated, tiny_model) <= 300
+    assert truncate_to_tokens("short", 300, tiny_model) == "short"
+
+
+def test_chunk_text_respects_limit_and_keeps_content(tiny_model):
+    paragraphs = [f"Paragraph {i}. " + "word " * 40 for i in range(30)]
+    text = "\n\n".join(paragraphs) + "\n\n" + "z" * 3000  # one paragraph larger than a chunk
+    chunks = chunk_text(text, 200, tiny_model)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk, tiny_model) <= 200 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_context_window_error_message():
+    error = context_window_error("tiny", 1500, 1000)
+    assert error.startswith(CONTEXT_WINDOW_ERROR_PREFIX)
+    assert "1500" in error and "1000-token" in error and "'tiny'" in error
@@ -0,0 +1,60 @@
+# --- Helper Package for AI-Driven Software Engineering Course ---
+# Description: This package provides a unified interface for interacting with
+#              multiple LLM providers (OpenAI, Anthropic, Hugging Face, Google Gemini)
+#              and simplifies common tasks like artifact management.
+#
+#              Submodules are loaded lazily on first attribute access, so a
+#              headless service that only needs setup_llm_client never pays
+#              for the imaging (PIL) or notebook display (IPython) stacks.
+# -----------------------------------------------------------------
+
+import importlib
+
+# Public name -> submodule that defines it.
+_LAZY_ATTRS = {
+    "RECOMMENDED_MODELS": "clients",
+    "load_environment": "clients",
+    "setup_llm_client": "clients",
+    "get_completion": "completion",
+    "clean_llm_output": "completion",
+    "map_reduce_completion": "completion",
+    "is_error_response": "completion",
+    "RateLimiter": "rate_limit",
+    "estimate_tokens": "tokens",
+    "context_limits": "tokens",
+    "fits_context": "tokens",
+    "chunk_text": "tokens",
+    "context_window_error": "tokens",
+    "CONTEXT_WINDOW_ERROR_PREFIX": "tokens",
+    "get_vision_completion": "vision",
+    "_find_project_root": "artifacts",
+    "save_artifact": "artifacts",
+    "load_artifact": "artifacts",
+    "atomic_write": "artifacts",
+    "build_artifact": "artifacts",
+    "ArtifactBuildError": "artifacts",
+    "artifact_inputs": "artifacts",
+    "artifact_hash": "artifacts",
+    "is_artifact_up_to_date": "artifacts",
+    "render_plantuml_diagram": "diagrams",
+    "render_mermaid_diagram": "diagrams",
+    "render_diagram": "diagrams",
+    "render_diagrams": "diagrams",
+    "set_diagram_backend": "diagrams",
+}
+
+__all__ = [name for name in _LAZY_ATTRS if not name.startswith("_")]
+
+
+def __getattr__(name):
+    """Imports the owning submodule on first access and caches the attribute."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
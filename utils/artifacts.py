@@ -0,0 +1,181 @@
+# --- Artifact Management ---
+# Description: Saving and loading generated artifacts relative to the project root.
+#              Writes are atomic, and a manifest records each artifact's content
+#              hash and the inputs (prompt, model, upstream artifacts) that
+#              produced it, so pipelines can skip stages that are up to date.
+# -----------------------------------------------------------------
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+
+MANIFEST_PATH = os.path.join("artifacts", ".manifest.json")
+_manifest_lock = threading.Lock()
+
+
+class ArtifactBuildError(RuntimeError):
+    """Raised when an artifact's generate() step returns an LLM error instead of content."""
+
+
+def _find_project_root():
+    """
+    Finds the project root by searching upwards for a known directory marker
+    (like '.git' or 'artifacts'). This is more reliable than just using os.getcwd().
+    The result is cached per working directory.
+    """
+    return _resolve_project_root(os.getcwd())
+
+
+@lru_cache(maxsize=None)
+def _resolve_project_root(cwd):
+    path = cwd
+    while path != os.path.dirname(path):
+        if any(os.path.exists(os.path.join(path, marker)) for marker in ['.git', 'artifacts', 'README.md']):
+            return path
+        path = os.path.dirname(path)
+    print("Warning: Project root marker not found. Defaulting to current directory.")
+    return cwd
+
+
+def atomic_write(full_path, data):
+    """
+    Writes bytes via a fsynced temp file in the same directory plus rename, so
+    readers never see a partial file; the temp file is removed if the write fails.
+    """
+    directory = os.path.dirname(os.path.abspath(full_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates files as 0600; keep the permissions a plain open() would give.
+        os.chmod(tmp_path, os.stat(full_path).st_mode if os.path.exists(full_path) else 0o644)
+        os.replace(tmp_path, full_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_inputs(inputs):
+    return _hash_bytes(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8'))
+
+
+# --- Manifest ---
+
+def _load_manifest():
+    full_path = os.path.join(_find_project_root(), MANIFEST_PATH)
+    try:
+        with open(full_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _record_in_manifest(file_path, content_hash, inputs):
+    with _manifest_lock:
+        manifest = _load_manifest()
+        manifest[file_path] = {
+            "sha256": content_hash,
+            "inputs": inputs,
+            "inputs_sha256": _hash_inputs(inputs),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        data = json.dumps(manifest, indent=2, sort_keys=True, default=str).encode('utf-8')
+        atomic_write(os.path.join(_find_project_root(), MANIFEST_PATH), data)
+
+
+def artifact_hash(file_path):
+    """Returns the sha256 of an artifact's current content, or None if it does not exist."""
+    try:
+        with open(os.path.join(_find_project_root(), file_path), 'rb') as f:
+            return _hash_bytes(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def artifact_inputs(prompt=None, model=None, depends_on=(), **extra):
+    """
+    Describes what generates an artifact: the prompt, the model and the current
+    content hash of each upstream artifact it depends on.
+    """
+    inputs = {"prompt": prompt, "model": model, "depends_on": {path: artifact_hash(path) for path in depends_on}}
+    inputs.update(extra)
+    return inputs
+
+
+def is_artifact_up_to_date(file_path, inputs):
+    """
+    Returns True if the artifact exists, has not been edited since it was
+    recorded, and was produced from exactly these inputs.
+    """
+    entry = _load_manifest().get(file_path)
+    if not entry:
+        return False
+    return entry.get("sha256") == artifact_hash(file_path) and entry.get("inputs_sha256") == _hash_inputs(inputs)
+
+
+# --- Save, Load & Build ---
+
+def save_artifact(content, file_path, inputs=None):
+    """
+    Saves content to a specified file path, creating directories if needed.
+    If inputs are given (see artifact_inputs), they are recorded in the manifest.
+    """
+    try:
+        full_path = os.path.join(_find_project_root(), file_path)
+        data = content.encode('utf-8')
+        content_hash = _hash_bytes(data)
+        # Leave unchanged files untouched so their mtime stays meaningful.
+        if artifact_hash(file_path) != content_hash:
+            atomic_write(full_path, data)
+        if inputs is not None:
+            _record_in_manifest(file_path, content_hash, inputs)
+        print(f"✅ Successfully saved artifact to: {file_path}")
+    except Exception as e:
+        print(f"❌ Error saving artifact to {file_path}: {e}")
+
+def load_artifact(file_path):
+    """Loads content from a specified file path."""
+    try:
+        project_root = _find_project_root()
+        full_path = os.path.join(project_root, file_path)
+        with open(full_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"❌ Error: Artifact file not found at {file_path}.")
+        return None
+
+def build_artifact(file_path, generate, prompt=None, model=None, depends_on=(), **extra):
+    """
+    Returns the artifact's content, calling generate() only when it is missing
+    or any of its inputs changed, like a build system target. If generate()
+    returns an error response (see is_error_response), nothing is saved and
+    ArtifactBuildError is raised, so the stage runs again next time. Chain
+    stages by listing upstream artifacts in depends_on, e.g.
+
+        prd = build_artifact("artifacts/prd.md", lambda: get_completion(prompt, ...),
+                             prompt=prompt, model=model_name,
+                             depends_on=["artifacts/requirements.md"])
+    """
+    inputs = artifact_inputs(prompt=prompt, model=model, depends_on=depends_on, **extra)
+    if is_artifact_up_to_date(file_path, inputs):
+        print(f"✅ Artifact is up to date, skipping regeneration: {file_path}")
+        return load_artifact(file_path)
+    from .completion import is_error_response
+
+    content = generate()
+    if is_error_response(content):
+        raise ArtifactBuildError(f"Could not build {file_path}: {content}")
+    save_artifact(content, file_path, inputs=inputs)
+    return content
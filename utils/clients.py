@@ -0,0 +1,123 @@
+# --- LLM Client Setup ---
+# Description: Model/provider configuration and API client initialization.
+#              Provider SDKs are imported only when a client is requested.
+# -----------------------------------------------------------------
+
+import os
+
+# --- Model & Provider Configuration ---
+# context_window and max_output are token limits used by the pre-flight guard in utils.tokens.
+RECOMMENDED_MODELS = {
+    # Original OpenAI Models
+    "gpt-4o":        {"provider": "openai", "vision": True, "context_window": 128000, "max_output": 16384, "overview": "Latest flagship model, fast and intelligent"},
+    "gpt-4.1":       {"provider": "openai", "vision": True, "context_window": 1047576, "max_output": 32768, "overview": "Advanced reasoning and instruction following"},
+    "gpt-4.1-mini":  {"provider": "openai", "vision": True, "context_window": 1047576, "max_output": 32768, "overview": "Compact and fast version of gpt-4.1"},
+    "gpt-4.1-nano":  {"provider": "openai", "vision": True, "context_window": 1047576, "max_output": 32768, "overview": "Highly efficient and lightweight model"},
+    "gpt-4.5":       {"provider": "openai", "vision": True, "context_window": 128000, "max_output": 16384, "overview": "Next-gen model with enhanced capabilities"},
+    "o3":            {"provider": "openai", "vision": True, "context_window": 200000, "max_output": 100000, "overview": "Specialized model for complex logic"},
+    "o4-mini":       {"provider": "openai", "vision": True, "context_window": 200000, "max_output": 100000, "overview": "Miniature version of the o4 model"},
+    "codex-mini-latest":    {"provider": "openai", "vision": False, "context_window": 200000, "max_output": 100000, "overview": "Optimized for code generation tasks"},
+
+    # Original Gemini Models
+    "gemini-2.5-pro":         {"provider": "gemini", "vision": True, "context_window": 1048576, "max_output": 65536, "overview": "High-performance, multimodal model"},
+    "gemini-2.5-flash":       {"provider": "gemini", "vision": True, "context_window": 1048576, "max_output": 65536, "overview": "Fast and cost-effective for high-frequency tasks"},
+    "gemini-2.5-flash-lite":  {"provider": "gemini", "vision": True, "context_window": 1048576, "max_output": 65536, "overview": "Extremely lightweight and fast model"},
+    "gemini-veo-3":           {"provider": "gemini", "vision": True, "context_window": 1048576, "max_output": 8192, "overview": "Advanced model for video understanding"},
+    "gemini-deep-think":      {"provider": "gemini", "vision": True, "context_window": 1048576, "max_output": 65536, "overview": "Specialized for deep, complex reasoning"},
+
+    # Original Hugging Face Models
+    "meta-llama/Llama-3.3-70B-Instruct": {"provider": "huggingface", "vision": False, "context_window": 131072, "max_output": 8192, "overview": "Large-scale Llama 3 model for instruction following"},
+    "tokyotech-llm/Llama-3.1-Swallow-8B-Instruct-v0.5": {"provider": "huggingface", "vision": False, "context_window": 131072, "max_output": 8192, "overview": "8B parameter model with strong instruction capabilities"},
+    "tokyotech-llm/Llama-3.1-Swallow-70B-Instruct-v0.3": {"provider": "huggingface", "vision": False, "context_window": 131072, "max_output": 8192, "overview": "70B parameter model for advanced tasks"},
+    "mistralai/Mistral-7B-Instruct-v0.3": {"provider": "huggingface", "vision": False, "context_window": 32768, "max_output": 4096, "overview": "Popular 7B model known for efficiency and performance"},
+    "deepseek-ai/DeepSeek-VL2":         {"provider": "huggingface", "vision": True, "context_window": 4096, "max_output": 2048, "overview": "Strong vision-language model"},
+    "deepseek-ai/DeepSeek-VL2-Small":   {"provider": "huggingface", "vision": True, "context_window": 4096, "max_output": 2048, "overview": "Smaller, faster version of DeepSeek-VL2"},
+    "deepseek-ai/DeepSeek-VL2-Tiny":    {"provider": "huggingface", "vision": True, "context_window": 4096, "max_output": 2048, "overview": "Lightweight vision-language model for edge devices"},
+    "deepseek-ai/DeepSeek-R1":          {"provider": "huggingface", "vision": False, "context_window": 131072, "max_output": 32768, "overview": "Advanced reasoning model from DeepSeek"},
+    "deepseek-ai/Janus-Pro-7B":         {"provider": "huggingface", "vision": True, "context_window": 4096, "max_output": 2048, "overview": "Multimodal model with strong reasoning skills"},
+
+    # --- Anthropic Models ---
+    "claude-opus-4-20250514":    {"provider": "anthropic", "vision": True, "context_window": 200000, "max_output": 32000, "overview": "Most powerful model for complex, multi-step tasks"},
+    "claude-sonnet-4-20250514":  {"provider": "anthropic", "vision": True, "context_window": 200000, "max_output": 64000, "overview": "Balanced model for enterprise workloads"},
+    "claude-3-7-sonnet-20250219": {"provider": "anthropic", "vision": True, "context_window": 200000, "max_output": 64000, "overview": "Highly capable Sonnet model for complex tasks"},
+    "claude-3-5-haiku-20241022":  {"provider": "anthropic", "vision": True, "context_window": 200000, "max_output": 8192, "overview": "Fastest and most compact model for near-instant responses"},
+}
+
+
+# --- Environment and API Client Setup ---
+# Placeholder credential sent to base_url stand-ins; the mock server accepts any key.
+MOCK_API_KEY = "mock"
+
+
+def load_environment():
+    """Loads environment variables from a .env file in the project root."""
+    path = os.getcwd()
+    while path != os.path.dirname(path):
+        if os.path.exists(os.path.join(path, '.env')) or os.path.exists(os.path.join(path, '.git')):
+            project_root = path
+            break
+        path = os.path.dirname(path)
+    else:
+        project_root = os.getcwd()
+
+    dotenv_path = os.path.join(project_root, '.env')
+    if os.path.exists(dotenv_path):
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            print("python-dotenv not found. Please install it by running: pip install python-dotenv")
+            return
+        load_dotenv(dotenv_path=dotenv_path)
+    else:
+        print("Warning: .env file not found. API keys may not be loaded.")
+
+
+def setup_llm_client(model_name="gpt-4o", base_url=None):
+    """
+    Initializes and returns the API client for the specified model provider.
+    base_url (or the LLM_MOCK_BASE_URL environment variable) points OpenAI,
+    Anthropic and Hugging Face clients at a local stand-in such as mock_llm_server.py;
+    they then authenticate with MOCK_API_KEY so real keys never reach the stand-in.
+    """
+    load_environment()
+    base_url = base_url or os.getenv("LLM_MOCK_BASE_URL")
+    if model_name not in RECOMMENDED_MODELS:
+        print(f"ERROR: Model '{model_name}' is not in the list of recommended models.")
+        return None, None, None
+    config = RECOMMENDED_MODELS[model_name]
+    api_provider = config["provider"]
+    client = None
+    try:
+        if api_provider == "openai":
+            from openai import OpenAI
+            api_key = MOCK_API_KEY if base_url else os.getenv("OPENAI_API_KEY")
+            if not api_key: raise ValueError("OPENAI_API_KEY not found in .env file.")
+            client = OpenAI(api_key=api_key, base_url=f"{base_url.rstrip('/')}/v1") if base_url else OpenAI(api_key=api_key)
+        elif api_provider == "anthropic":
+            from anthropic import Anthropic
+            api_key = MOCK_API_KEY if base_url else os.getenv("ANTHROPIC_API_KEY")
+            if not api_key: raise ValueError("ANTHROPIC_API_KEY not found in .env file.")
+            client = Anthropic(api_key=api_key, base_url=base_url) if base_url else Anthropic(api_key=api_key)
+        elif api_provider == "huggingface":
+            from huggingface_hub import InferenceClient
+            api_key = MOCK_API_KEY if base_url else os.getenv("HUGGINGFACE_API_KEY")
+            if not api_key: raise ValueError("HUGGINGFACE_API_KEY not found in .env file.")
+            # The mock speaks the OpenAI-compatible chat route that InferenceClient uses with base_url.
+            client = InferenceClient(base_url=base_url, token=api_key) if base_url else InferenceClient(model=model_name, token=api_key)
+        elif api_provider == "gemini":
+            if base_url:
+                print("Warning: The mock server does not emulate Gemini; using the live API.")
+            import google.generativeai as genai
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key: raise ValueError("GOOGLE_API_KEY not found in .env file.")
+            genai.configure(api_key=api_key)
+            client = genai.GenerativeModel(model_name)
+    except ImportError:
+        print(f"ERROR: The required library for '{api_provider}' is not installed.")
+        return None, None, None
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return None, None, None
+    target = f" via {base_url}" if base_url and api_provider != "gemini" else ""
+    print(f"✅ LLM Client configured: Using '{api_provider}' with model '{model_name}'{target}")
+    return client, model_name, api_provider
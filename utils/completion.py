@@ -0,0 +1,118 @@
+# --- Core Interaction Functions ---
+# Description: Text completions across providers and LLM output cleanup.
+#              Prompts are checked against the model's context window before
+#              any request is sent, and max_tokens is sized to what remains.
+# -----------------------------------------------------------------
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .tokens import (estimate_tokens, context_limits, output_budget, reserved_output_tokens, truncate_to_tokens,
+                     chunk_text, context_window_error, CONTEXT_WINDOW_ERROR_PREFIX)
+
+# Tokens reserved for the map/reduce prompt wrappers around each chunk.
+_MAP_REDUCE_OVERHEAD_TOKENS = 256
+_GENERIC_INSTRUCTION = "Respond to the request contained in the following text."
+# The completion helpers report failures as strings starting with one of these rather than raising.
+# Only specific markers are listed, so a real answer that begins with "Error:" is not a failure.
+_ERROR_PREFIXES = ("An API error occurred", "API client not initialized", CONTEXT_WINDOW_ERROR_PREFIX,
+                   "Error: Model '")  # get_vision_completion's unsupported-model message
+
+
+def is_error_response(response):
+    """Returns True if a get_completion (or get_vision_completion) result represents a failed call."""
+    return not isinstance(response, str) or response.startswith(_ERROR_PREFIXES)
+
+
+def get_completion(prompt, client, model_name, api_provider, temperature=0.7, max_tokens=None, overflow="reject"):
+    """
+    Gets a text completion from the specified LLM.
+
+    A prompt too large for the model's context window is handled locally
+    according to overflow: 'reject' returns an error without calling the API,
+    'truncate' trims the middle of the prompt, and 'map_reduce' processes it in
+    chunks and combines the partial results.
+    """
+    if not client: return "API client not initialized."
+    context_window, _ = context_limits(model_name)
+    reserved_output = reserved_output_tokens(model_name, max_tokens)
+    prompt_tokens = estimate_tokens(prompt, model_name)
+    if prompt_tokens + reserved_output > context_window:
+        if overflow == "truncate":
+            prompt = truncate_to_tokens(prompt, context_window - reserved_output, model_name)
+            prompt_tokens = estimate_tokens(prompt, model_name)
+        elif overflow == "map_reduce":
+            return map_reduce_completion(_GENERIC_INSTRUCTION, prompt, client, model_name, api_provider,
+                                         temperature=temperature, max_tokens=max_tokens)
+        else:
+            return context_window_error(model_name, prompt_tokens, context_window)
+    budget = output_budget(prompt_tokens, model_name, max_tokens)
+    try:
+        if api_provider == "openai":
+            # Only cap OpenAI output when asked to; the API sizes it to the context otherwise.
+            limit = {"max_completion_tokens": budget} if max_tokens else {}
+            response = client.chat.completions.create(model=model_name, messages=[{"role": "user", "content": prompt}], temperature=temperature, **limit)
+            return response.choices[0].message.content
+        elif api_provider == "anthropic":
+            response = client.messages.create(
+                model=model_name,
+                max_tokens=budget,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.content[0].text
+        elif api_provider == "huggingface":
+            response = client.chat_completion(messages=[{"role": "user", "content": prompt}], temperature=max(0.1, temperature), max_tokens=budget)
+            return response.choices[0].message.content
+        elif api_provider == "gemini":
+            config = {"max_output_tokens": budget} if max_tokens else None
+            response = client.generate_content(prompt, generation_config=config)
+            return response.text
+    except Exception as e:
+        return f"An API error occurred: {e}"
+
+def map_reduce_completion(instruction, text, client, model_name, api_provider, temperature=0.7,
+                          max_tokens=None, max_workers=4):
+    """
+    Applies instruction to text too large for one request: each chunk is
+    processed concurrently (map), then the partial results are combined (reduce).
+    """
+    context_window, _ = context_limits(model_name)
+    reserved_output = reserved_output_tokens(model_name, max_tokens)
+    chunk_tokens = (context_window - reserved_output - _MAP_REDUCE_OVERHEAD_TOKENS
+                    - estimate_tokens(instruction, model_name))
+    if chunk_tokens <= 0:
+        return context_window_error(model_name, estimate_tokens(instruction, model_name), context_window)
+    chunks = chunk_text(text, chunk_tokens, model_name)
+
+    def map_chunk(indexed_chunk):
+        index, chunk = indexed_chunk
+        prompt = (f"{instruction}\n\nThis is part {index} of {len(chunks)} of the input. Work only from this "
+                  f"part; the partial results will be combined afterwards.\n\n{chunk}")
+        return get_completion(prompt, client, model_name, api_provider, temperature=temperature, max_tokens=max_tokens)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        partials = list(executor.map(map_chunk, enumerate(chunks, start=1)))
+    for partial in partials:
+        if is_error_response(partial):
+            return partial
+    if len(partials) == 1:
+        return partials[0]
+    combined = "\n\n".join(f"--- Part {i} ---\n{partial}" for i, partial in enumerate(partials, start=1))
+    reduce_prompt = (f"{instruction}\n\nThe input was too long to process at once, so it was split into "
+                     f"{len(partials)} parts. Combine the partial results below into one complete response.\n\n{combined}")
+    return get_completion(reduce_prompt, client, model_name, api_provider, temperature=temperature,
+                          max_tokens=max_tokens, overflow="truncate")
+
+def clean_llm_output(output_str: str, language: str = 'json') -> str:
+    """Cleans markdown code blocks from LLM output."""
+    if '```' in output_str:
+        pattern = re.compile(rf'```{language}\n(.*?)\n```', re.DOTALL | re.MULTILINE)
+        match = pattern.search(output_str)
+        if match:
+            return match.group(1).strip()
+        else:
+            cleaned = output_str.split('```', 1)[-1]
+            cleaned = cleaned.rsplit('```', 1)[0]
+            return cleaned.strip().lstrip(language).strip()
+    return output_str.strip()
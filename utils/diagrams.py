@@ -0,0 +1,213 @@
+# --- Diagram Rendering & Display ---
+# Description: Renders PlantUML and Mermaid diagrams and displays them inline.
+#              Rendering goes through a pluggable backend (public server or a
+#              local renderer for offline use) behind a cache keyed by a hash of
+#              the diagram source and theme. Imports the IPython display stack,
+#              so it is loaded on first use.
+# -----------------------------------------------------------------
+
+import os
+import json
+import base64
+import hashlib
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .artifacts import _find_project_root, atomic_write
+
+try:
+    from IPython.display import display, Image as IPyImage
+except ImportError:
+    print("Diagram dependencies not found. Please install them by running:")
+    print("pip install ipython plantuml")
+
+CACHE_DIR = os.path.join("artifacts", ".diagram_cache")
+
+
+# --- Rendering Backends ---
+# A backend is any object with render(source, theme) -> PNG bytes. An optional
+# cache_id string names the renderer in cache keys (default: its class name).
+
+def _apply_plantuml_theme(source, theme):
+    """Adds a `!theme` directive after @startuml unless the theme is 'default' or the source sets one."""
+    if theme == "default" or "!theme" in source:
+        return source
+    lines = source.splitlines()
+    for index, line in enumerate(lines):
+        if line.strip().startswith("@start"):
+            lines.insert(index + 1, f"!theme {theme}")
+            return "\n".join(lines)
+    return f"!theme {theme}\n{source}"
+
+
+class PlantUMLServerBackend:
+    """Renders PlantUML through a PlantUML server (public plantuml.com by default)."""
+
+    def __init__(self, url="http://www.plantuml.com/plantuml/img/"):
+        self.url = url
+        self.cache_id = f"plantuml-server:{url}"
+
+    def render(self, source, theme="default"):
+        from plantuml import PlantUML
+        return PlantUML(url=self.url).processes(_apply_plantuml_theme(source, theme))
+
+
+class LocalPlantUMLBackend:
+    """Renders PlantUML offline with a local plantuml.jar (requires Java)."""
+
+    def __init__(self, jar_path, java="java", timeout=60):
+        self.jar_path = jar_path
+        self.java = java
+        self.timeout = timeout
+        self.cache_id = f"plantuml-jar:{os.path.abspath(jar_path)}"
+
+    def render(self, source, theme="default"):
+        result = subprocess.run(
+            [self.java, "-Djava.awt.headless=true", "-jar", self.jar_path, "-pipe", "-tpng"],
+            input=_apply_plantuml_theme(source, theme).encode("utf-8"), capture_output=True, timeout=self.timeout, check=True,
+        )
+        return result.stdout
+
+
+class MermaidInkBackend:
+    """Renders Mermaid through the public mermaid.ink service."""
+
+    def __init__(self, url="https://mermaid.ink/img/", timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self.cache_id = f"mermaid-ink:{url}"
+
+    def render(self, source, theme="default"):
+        data = {"code": source, "mermaid": {"theme": theme}}
+        encoded = base64.b64encode(json.dumps(data).encode("utf-8")).decode("utf-8")
+        response = requests.get(f"{self.url}{encoded}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+
+class LocalMermaidBackend:
+    """Renders Mermaid offline with the mermaid-cli (`mmdc`) executable."""
+
+    def __init__(self, mmdc="mmdc", timeout=60):
+        self.mmdc = mmdc
+        self.timeout = timeout
+        self.cache_id = f"mmdc:{mmdc}"
+
+    def render(self, source, theme="default"):
+        with tempfile.TemporaryDirectory() as tmp:
+            src_path, out_path = os.path.join(tmp, "diagram.mmd"), os.path.join(tmp, "diagram.png")
+            with open(src_path, "w", encoding="utf-8") as f:
+                f.write(source)
+            subprocess.run([self.mmdc, "-i", src_path, "-o", out_path, "-t", theme],
+                           capture_output=True, timeout=self.timeout, check=True)
+            with open(out_path, "rb") as f:
+                return f.read()
+
+
+def _default_backends():
+    # PLANTUML_JAR / mmdc on PATH switch to local rendering so diagrams work offline.
+    jar_path = os.getenv("PLANTUML_JAR")
+    return {
+        "plantuml": LocalPlantUMLBackend(jar_path) if jar_path else PlantUMLServerBackend(),
+        "mermaid": LocalMermaidBackend() if shutil.which("mmdc") else MermaidInkBackend(),
+    }
+
+DIAGRAM_BACKENDS = _default_backends()
+
+
+def set_diagram_backend(kind, backend):
+    """Replaces the renderer used for 'plantuml' or 'mermaid' diagrams."""
+    DIAGRAM_BACKENDS[kind] = backend
+
+
+# --- Render Cache ---
+
+_memory_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _backend_id(backend):
+    return getattr(backend, "cache_id", None) or f"{type(backend).__module__}.{type(backend).__qualname__}"
+
+
+def _cache_key(kind, source, theme, backend_id):
+    # The backend is part of the key, so switching renderers never serves the old renderer's images.
+    return hashlib.sha256(f"{kind}\0{backend_id}\0{theme}\0{source}".encode("utf-8")).hexdigest()
+
+
+def render_diagram(kind, source, theme="default"):
+    """
+    Returns PNG bytes for a diagram, rendering it only on a cache miss.
+    Hits are served from memory, then from artifacts/.diagram_cache on disk.
+    """
+    backend = DIAGRAM_BACKENDS[kind]
+    key = _cache_key(kind, source, theme, _backend_id(backend))
+    cached = _memory_cache.get(key)
+    if cached is not None:
+        return cached
+    cache_path = os.path.join(_find_project_root(), CACHE_DIR, f"{key}.png")
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            image = f.read()
+    else:
+        image = backend.render(source, theme)
+        atomic_write(cache_path, image)
+    with _cache_lock:
+        _memory_cache[key] = image
+    return image
+
+
+def _save_diagram(kind, source, output_path, theme="default"):
+    full_path = os.path.join(_find_project_root(), output_path)
+    atomic_write(full_path, render_diagram(kind, source, theme))
+    return full_path
+
+
+def render_diagrams(diagrams, max_workers=8):
+    """
+    Renders many diagrams concurrently without displaying them.
+    diagrams is a list of dicts with 'kind', 'source', 'output_path' and optional 'theme'.
+    Returns the saved full paths in order, with None for diagrams that failed.
+    """
+    def render_one(spec):
+        try:
+            return _save_diagram(spec["kind"], spec["source"], spec["output_path"], spec.get("theme", "default"))
+        except Exception as e:
+            print(f"❌ Error rendering diagram to {spec.get('output_path')}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(render_one, diagrams))
+
+
+def render_plantuml_diagram(puml_code, output_path="artifacts/diagram.png", theme="default"):
+    """Renders PlantUML code (or a .puml file path relative to the project root) and saves it as a PNG image."""
+    try:
+        project_root = _find_project_root()
+        puml_file = os.path.join(project_root, puml_code)
+        if "\n" not in puml_code and os.path.isfile(puml_file):
+            with open(puml_file, "r", encoding="utf-8") as f:
+                puml_code = f.read()
+        full_path = _save_diagram("plantuml", puml_code, output_path, theme)
+        print(f"✅ Diagram rendered and saved to: {output_path}")
+        display(IPyImage(filename=full_path))
+    except Exception as e:
+        print(f"❌ Error rendering PlantUML diagram: {e}")
+
+
+def render_mermaid_diagram(mermaid_code, output_path="artifacts/diagram.png", theme="default"):
+    """Renders Mermaid code and saves it as a PNG image."""
+    try:
+        # Remove erroneous 'ermaid' prefix if present
+        if mermaid_code.startswith("ermaid"):
+            mermaid_code = mermaid_code.replace("ermaid\n", "", 1)
+        full_path = _save_diagram("mermaid", mermaid_code, output_path, theme)
+        print(f"✅ Diagram rendered and saved to: {output_path}")
+        display(IPyImage(filename=full_path))
+    except Exception as e:
+        print(f"❌ Error rendering Mermaid diagram: {e}")
@@ -0,0 +1,25 @@
+# --- Client-Side Rate Limiting ---
+# Description: Spaces outgoing LLM requests evenly so concurrent callers
+#              (evaluation runs, batch generation, parallel plans) stay under a
+#              provider's requests-per-second limit.
+# -----------------------------------------------------------------
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls evenly at `rate` per second (no limit if rate is falsy)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
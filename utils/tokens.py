@@ -0,0 +1,119 @@
+# --- Token Counting & Context-Window Guard ---
+# Description: Fast local token estimates (tiktoken when installed, a
+#              calibrated characters-per-token heuristic otherwise) and a
+#              pre-flight check that catches oversized prompts before they cost
+#              a network round-trip.
+# -----------------------------------------------------------------
+
+import math
+import re
+from functools import lru_cache
+
+from .clients import RECOMMENDED_MODELS
+
+# Output budget used when the caller does not ask for one (the previous fixed max_tokens).
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+# Heuristic estimates are inflated by this factor so they err towards rejecting, not failing remotely.
+SAFETY_MARGIN = 1.1
+# Average characters per token on English prose and code, per provider tokenizer family.
+CHARS_PER_TOKEN = {"openai": 4.0, "anthropic": 3.5, "gemini": 4.0, "huggingface": 3.7}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+
+# A prompt rejected by the context-window guard is reported as a string starting with this.
+CONTEXT_WINDOW_ERROR_PREFIX = "Error: Prompt of ~"
+
+
+def context_window_error(model_name, prompt_tokens, context_window):
+    """Formats the error string the completion helpers return for a prompt too large for the model."""
+    return (f"{CONTEXT_WINDOW_ERROR_PREFIX}{prompt_tokens} tokens exceeds the {context_window}-token "
+            f"context window of '{model_name}'.")
+
+
+@lru_cache(maxsize=None)
+def _tiktoken_encoding(model_name):
+    """Returns a tiktoken encoding for OpenAI models, or None if unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def estimate_tokens(text, model_name=None):
+    """Estimates the number of tokens text uses for the given model."""
+    config = RECOMMENDED_MODELS.get(model_name, {})
+    provider = config.get("provider", "openai")
+    if provider == "openai" and model_name:
+        encoding = _tiktoken_encoding(model_name)
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN.get(provider, 4.0) * SAFETY_MARGIN)
+
+
+def context_limits(model_name):
+    """Returns (context_window, max_output) tokens for a model."""
+    config = RECOMMENDED_MODELS.get(model_name, {})
+    context_window = config.get("context_window", DEFAULT_CONTEXT_WINDOW)
+    return context_window, config.get("max_output", min(DEFAULT_MAX_OUTPUT_TOKENS, context_window // 2))
+
+
+def reserved_output_tokens(model_name, max_tokens=None):
+    """Returns the output tokens a request must leave room for: the requested (or default) budget, capped by the model."""
+    return min(max_tokens or DEFAULT_MAX_OUTPUT_TOKENS, context_limits(model_name)[1])
+
+
+def fits_context(prompt, model_name, max_tokens=None):
+    """Returns True if prompt plus its output reserve fits the model's context window (the get_completion guard)."""
+    context_window, _ = context_limits(model_name)
+    return estimate_tokens(prompt, model_name) + reserved_output_tokens(model_name, max_tokens) <= context_window
+
+
+def output_budget(prompt_tokens, model_name, max_tokens=None):
+    """
+    Sizes max_tokens for a request: the requested (or default) budget, capped by
+    the model's output limit and by what is left of the context window.
+    Returns 0 if the prompt leaves no room for output.
+    """
+    context_window, max_output = context_limits(model_name)
+    requested = max_tokens or DEFAULT_MAX_OUTPUT_TOKENS
+    return max(0, min(requested, max_output, context_window - prompt_tokens))
+
+
+def truncate_to_tokens(text, max_tokens, model_name=None):
+    """Keeps the head and tail of text within max_tokens, marking the elided middle."""
+    tokens = estimate_tokens(text, model_name)
+    if tokens <= max_tokens:
+        return text
+    marker = "\n\n[... truncated to fit the context window ...]\n\n"
+    keep_chars = max(0, int(len(text) * max_tokens / tokens) - len(marker))
+    head = keep_chars * 2 // 3
+    return text[:head] + marker + text[len(text) - (keep_chars - head):]
+
+
+def chunk_text(text, max_tokens, model_name=None):
+    """Splits text into chunks of at most ~max_tokens, preferring paragraph then line boundaries."""
+    chunks, current = [], ""
+    for piece in re.split(r'(\n\s*\n)', text):
+        candidate = current + piece
+        if current and estimate_tokens(candidate, model_name) > max_tokens:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+        # A single oversized paragraph is split further by lines, then by characters.
+        while estimate_tokens(current, model_name) > max_tokens:
+            lines = current.splitlines(keepends=True)
+            if len(lines) > 1:
+                split_at = len(lines) // 2
+                first, current = "".join(lines[:split_at]), "".join(lines[split_at:])
+            else:
+                split_at = len(current) // 2
+                first, current = current[:split_at], current[split_at:]
+            chunks.extend(chunk_text(first, max_tokens, model_name))
+    if current.strip():
+        chunks.append(current)
+    return chunks
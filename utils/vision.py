@@ -0,0 +1,53 @@
+# --- Vision Completions ---
+# Description: Image-plus-text completions. Loads requests and PIL, so it is
+#              only imported when a vision helper is first used.
+# -----------------------------------------------------------------
+
+import base64
+from io import BytesIO
+
+import requests
+from PIL import Image
+
+from .clients import RECOMMENDED_MODELS
+
+def get_vision_completion(prompt, image_url, client, model_name, api_provider):
+    """Gets a vision-enhanced completion from the specified LLM."""
+    if not client: return "API client not initialized."
+    if not RECOMMENDED_MODELS.get(model_name, {}).get("vision"):
+        return f"Error: Model '{model_name}' does not support vision."
+    try:
+        response = requests.get(image_url)
+        response.raise_for_status()
+        img = Image.open(BytesIO(response.content))
+
+        if api_provider == "openai":
+            response = client.chat.completions.create(model=model_name, messages=[{"role": "user", "content": [{"type": "text", "text": prompt}, {"type": "image_url", "image_url": {"url": image_url}}]}], max_tokens=4096)
+            return response.choices[0].message.content
+        elif api_provider == "anthropic":
+            buffered = BytesIO()
+            image_format = img.format if img.format else "JPEG"
+            img.save(buffered, format=image_format)
+            img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            media_type = f"image/{image_format.lower()}"
+
+            response = client.messages.create(
+                model=model_name,
+                max_tokens=4096,
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": img_base64}},
+                        {"type": "text", "text": prompt}
+                    ],
+                }],
+            )
+            return response.content[0].text
+        elif api_provider == "gemini":
+            response = client.generate_content([prompt, img])
+            return response.text
+        elif api_provider == "huggingface":
+            response = client.image_to_text(image=img, prompt=prompt)
+            return response
+    except Exception as e:
+        return f"An API error occurred during vision completion: {e}"